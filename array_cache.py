@@ -0,0 +1,222 @@
+"""
+Content-addressed on-disk cache for functions that return numpy arrays.
+
+disk_cache hashes the bound arguments of a call together with the source
+of the function's module (and of any modules it depends on), so editing
+the code invalidates old entries. A result (one array, a tuple of arrays
+or a dict of arrays) is stored as a directory of .npy files, written to a
+temporary name and renamed into place, so concurrent processes never see
+a half-written entry. A hit returns read-only np.load(mmap_mode='r')
+views: nothing is copied and processes of a sweep share the pages.
+
+The cache directory is bounded: once the stored size passes max_bytes the
+least recently used entries (by modification time, refreshed on each hit)
+are removed until the total size is below it. The size is scanned on the
+first store and then counted, so a store does not list the directory;
+with several writers it can pass max_bytes by what the other processes
+stored since this one last scanned. The directory defaults to
+$ARRAY_CACHE_DIR or .array_cache next to this file; ARRAY_CACHE=0 turns
+caching off.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import marshal
+import os
+import shutil
+import sys
+import tempfile
+import tokenize
+import numpy as np
+
+DEFAULT_DIR = os.environ.get('ARRAY_CACHE_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), '.array_cache'))
+
+
+def _update(hasher, value):
+    """Feeds a canonical encoding of value to hasher"""
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        hasher.update(f"ndarray:{value.dtype.str}:{value.shape}:".encode())
+        hasher.update(value.view(np.uint8).data if value.size else b'')
+    elif isinstance(value, dict):
+        hasher.update(b"dict{")
+        for key in sorted(value, key=repr):
+            _update(hasher, key)
+            _update(hasher, value[key])
+        hasher.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}[".encode())
+        for item in value:
+            _update(hasher, item)
+        hasher.update(b"]")
+    elif isinstance(value, (np.generic, float, int, bool, str, bytes, type(None))):
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, int) and not isinstance(value, bool) and abs(value) <= 2**53:
+            # Equal numbers are the same parameter: 1 and 1.0 give one key
+            value = float(value)
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    else:
+        raise TypeError(f"Cannot hash argument of type {type(value).__name__}")
+
+
+def source_version(*objects):
+    """
+    Hash of the source code of the given modules or functions. A module
+    may also be given by name, which reads its file without importing it
+    and hashes the same as the module itself.
+    """
+    hasher = hashlib.sha256()
+    for obj in objects:
+        if isinstance(obj, str):
+            spec = importlib.util.find_spec(obj)
+            if spec is None or not spec.has_location:
+                raise TypeError(f"No source file for module {obj!r}")
+            with tokenize.open(spec.origin) as f:
+                hasher.update(f.read().encode())
+        else:
+            hasher.update(inspect.getsource(obj).encode())
+    return hasher.hexdigest()
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def evict(cache_dir, max_bytes):
+    """
+    Removes least recently used entries until cache_dir holds at most
+    max_bytes. Returns the size left.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith('.') or not os.path.isdir(path):
+            continue
+        try:
+            entries.append((os.path.getmtime(path), _directory_size(path), path))
+        except FileNotFoundError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+    return total
+
+
+# Size of each cache directory as last scanned plus what this process
+# stored since, so the directory is only scanned when the limit is crossed
+_sizes = {}
+
+
+def _account(cache_dir, size, max_bytes):
+    total = _sizes.get(cache_dir)
+    total = evict(cache_dir, max_bytes) if total is None else total + size
+    if total > max_bytes:
+        total = evict(cache_dir, max_bytes)
+    _sizes[cache_dir] = total
+
+
+def _store(path, result):
+    """Writes result as the entry path and returns its size in bytes"""
+    if isinstance(result, np.ndarray):
+        kind, arrays = 'array', {'0': result}
+    elif isinstance(result, tuple):
+        kind, arrays = 'tuple', {str(i): a for i, a in enumerate(result)}
+    elif isinstance(result, dict):
+        kind, arrays = 'dict', result
+    else:
+        raise TypeError(f"Cannot cache result of type {type(result).__name__}")
+
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(path))
+    try:
+        names = []
+        for i, (name, array) in enumerate(arrays.items()):
+            np.save(os.path.join(staging, f"{i}.npy"), np.asarray(array), allow_pickle=False)
+            names.append(name)
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'kind': kind, 'names': names}, f)
+        size = _directory_size(staging)
+        os.rename(staging, path)
+    except OSError:
+        # Another process stored the same entry first
+        if not os.path.isdir(path):
+            raise
+        size = 0
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return size
+
+
+def _load(path):
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    arrays = [np.load(os.path.join(path, f"{i}.npy"), mmap_mode='r')
+              for i in range(len(meta['names']))]
+    os.utime(path)
+    if meta['kind'] == 'array':
+        return arrays[0]
+    if meta['kind'] == 'tuple':
+        return tuple(arrays)
+    return dict(zip(meta['names'], arrays))
+
+
+def disk_cache(func=None, *, cache_dir=None, max_bytes=2**30, depends=(), version=''):
+    """
+    Decorator caching the array results of func on disk.
+
+    The key covers the module and name of func, its arguments after
+    defaults are applied (numbers, strings, None, numpy arrays and nested
+    lists, tuples and dicts of those; equal int and float numbers give
+    the same key), the source of func's module and
+    of the modules in depends, and the free-form version string. Can be
+    used bare (@disk_cache) or with options (@disk_cache(depends=[m])).
+    The wrapper has cache_key(*args, **kwargs) and a cache_dir attribute.
+    """
+    if func is None:
+        return functools.partial(disk_cache, cache_dir=cache_dir, max_bytes=max_bytes,
+                                 depends=depends, version=version)
+
+    signature = inspect.signature(func)
+    try:
+        code_version = source_version(sys.modules[func.__module__], *depends)
+    except (OSError, TypeError):
+        # No source file (interactive session): use the compiled code instead
+        code_version = (source_version(*depends)
+                        + hashlib.sha256(marshal.dumps(func.__code__)).hexdigest())
+    code_version += version
+
+    def cache_key(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        hasher = hashlib.sha256()
+        _update(hasher, [func.__module__, func.__qualname__, code_version])
+        _update(hasher, dict(bound.arguments))
+        return hasher.hexdigest()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if os.environ.get('ARRAY_CACHE', '1') == '0':
+            return func(*args, **kwargs)
+        directory = wrapper.cache_dir
+        path = os.path.join(directory, cache_key(*args, **kwargs))
+        if os.path.isdir(path):
+            try:
+                return _load(path)
+            except (FileNotFoundError, ValueError):
+                # Evicted or damaged while being read: recompute
+                pass
+        result = func(*args, **kwargs)
+        os.makedirs(directory, exist_ok=True)
+        _account(directory, _store(path, result), max_bytes)
+        return _load(path) if os.path.isdir(path) else result
+
+    wrapper.cache_key = cache_key
+    wrapper.cache_dir = cache_dir or DEFAULT_DIR
+    return wrapper
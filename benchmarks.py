@@ -0,0 +1,903 @@
+"""
+Timing of the compute kernels against the original script implementations.
+
+Usage:
+    python benchmarks.py            # run every benchmark
+    python benchmarks.py kp_bands   # run only the named ones
+    python benchmarks.py kernels    # headless kernel sizes, appended to benchmark_history.jsonl
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import operator
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+import kp_bands
+import dispersion
+import transfer_matrix
+import lattice_potential
+import schrodinger_fd
+import wavepacket
+import wave_animation
+import wave_field
+import diffraction
+import sampling
+import buildup
+import array_cache
+import pseudopotential
+import resampling
+from kp_bands import m, hbar, eV
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    """Best wall time in seconds of func(*args, **kwargs) over repeat runs"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Budget overruns found by the benchmarks; reported at the end of the run
+regressions = []
+
+
+def print_table(header, rows):
+    widths = [max(len(str(c)) for c in col) for col in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  " + "  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
+
+
+# --- Kronig-Penney band condition ---
+
+def loop_kp_masks(E, a_values, b_values, V_0_values):
+    """Per-crystal loop as originally written in plot_figures.py"""
+    masks = []
+    for a, b, V_0 in zip(a_values, b_values, V_0_values):
+        kappa = m * b * V_0 / hbar**2
+        q = np.sqrt(2 * m * E) / hbar
+        f = np.cos(q * a) + kappa / q * np.sin(q * a)
+        masks.append((f >= -1) & (f <= 1))
+    return masks
+
+
+def bench_kp_bands(sizes=(1, 100, 10000), n_energies=20000):
+    rng = np.random.default_rng(0)
+    E = np.linspace(0, 100 * eV, n_energies)
+    rows = []
+    for n in sizes:
+        a_values = rng.uniform(3, 6, n) * 1e-10
+        b_values = .1 * a_values
+        V_0_values = -rng.uniform(4, 40, n) * eV
+        repeat = 3 if n < 1000 else 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_loop = best_time(loop_kp_masks, E, a_values, b_values, V_0_values, repeat=repeat)
+        t_batch = best_time(kp_bands.allowed_band_masks, E, a_values, b_values, V_0_values, repeat=repeat)
+        rows.append([n, f"{t_loop:.4f}", f"{t_batch:.4f}", f"{t_loop / t_batch:.2f}x",
+                     f"{n / t_batch:.0f}"])
+    print(f"Kronig-Penney allowed-band masks ({n_energies} energies)")
+    print_table(["materials", "loop (s)", "batch (s)", "speedup", "materials/s"], rows)
+
+
+def bench_band_edges(n_materials=100, n_dense=20000, n_scan=1000):
+    rng = np.random.default_rng(0)
+    a_values = rng.uniform(3, 6, n_materials) * 1e-10
+    b_values = .1 * a_values
+    V_0_values = -rng.uniform(4, 40, n_materials) * eV
+    E_max = 100 * eV
+    E = np.linspace(0, E_max, n_dense)
+
+    def dense():
+        mask = kp_bands.allowed_band_masks(E, a_values, b_values, V_0_values)
+        return kp_bands.band_segments(mask)
+
+    t_dense = best_time(dense)
+    t_edges = best_time(kp_bands.band_edges, a_values, b_values, V_0_values, E_max, n_scan=n_scan)
+    rows, bands = kp_bands.band_edges(a_values, b_values, V_0_values, E_max, n_scan=n_scan)
+    n_iter = int(np.ceil(np.log2(E_max / (n_scan - 1) / (1e-12 * eV))))
+    evaluations = n_materials * n_scan + 2 * len(bands) * (n_iter + 2)
+    print(f"Band edges for {n_materials} crystals")
+    print_table(["method", "time (s)", "f evaluations", "edge resolution (eV)"], [
+        ["dense mask", f"{t_dense:.4f}", n_materials * n_dense, f"{E_max / (n_dense - 1) / eV:.1e}"],
+        ["bisection", f"{t_edges:.4f}", evaluations, "1.0e-12"],
+    ])
+
+
+def bench_dispersion(n_materials=300, n_k=101):
+    rng = np.random.default_rng(0)
+    a_values = rng.uniform(3, 6, n_materials) * 1e-10
+    b_values = .1 * a_values
+    V_0_values = -rng.uniform(4, 40, n_materials) * eV
+    E_max = 100 * eV
+    rows = []
+    for name, func, kwargs in [
+        ("uniform", dispersion.dispersion, {"n_k": n_k}),
+        ("adaptive", dispersion.adaptive_dispersion, {}),
+    ]:
+        start = time.perf_counter()
+        k_reduced, _, E = func(a_values, b_values, V_0_values, E_max, **kwargs)
+        elapsed = time.perf_counter() - start
+        rows.append([name, f"{elapsed:.3f}", len(k_reduced), E.shape[0], f"{E.nbytes / 1e6:.1f}"])
+    print(f"Dispersion relation for {n_materials} crystals")
+    print_table(["k-grid", "time (s)", "k-points", "bands", "E(k) (MB)"], rows)
+
+
+def bench_transfer_matrix(n_segments=10000, n_energies=100000):
+    rng = np.random.default_rng(0)
+    E = np.linspace(0.1, 50, n_energies)
+    edges = np.concatenate(([0], np.cumsum(rng.uniform(0.1, 1, n_segments))))
+    values = rng.choice([0, -20, 5], n_segments)
+    cell_edges, cell_values = np.array([0, 1, 20]), np.array([-20, 0])
+
+    def periodic():
+        M, log_scale = transfer_matrix.transfer_matrix(cell_edges, cell_values, E)
+        return transfer_matrix.repeat_product(M, log_scale, n_segments // 2)
+
+    t_general = best_time(transfer_matrix.transfer_matrix, edges, values, E, repeat=1)
+    t_periodic = best_time(periodic)
+
+    # Long random chain between free leads: no energy may come back NaN
+    rng = np.random.default_rng(1)
+    chain = np.concatenate(([0.0], rng.uniform(0, 3, n_segments), [0.0]))
+    chain_edges = np.cumsum(np.concatenate(([-1.0, 1.0], rng.uniform(0.1, 1, n_segments), [1.0])))
+    T, R = transfer_matrix.transmission(chain_edges, chain, np.linspace(0.1, 5, 1000))
+    assert np.all(np.isfinite(T)) and np.allclose(T + R, 1), "transmission lost on a random chain"
+    print(f"Transfer matrices through {n_segments} segments")
+    print_table(["chain", "energies", "time (s)", "ns / segment / energy"], [
+        ["arbitrary", n_energies, f"{t_general:.3f}", f"{t_general / n_segments / n_energies * 1e9:.1f}"],
+        ["periodic", n_energies, f"{t_periodic:.3f}", f"{t_periodic / n_segments / n_energies * 1e9:.3f}"],
+    ])
+
+
+# --- Lattice potentials ---
+
+def loop_lattice_potentials(x, num_atoms, lattice_const, well_width, v0):
+    """Per-atom loops as originally written in kp-potential.py"""
+    v_real = np.zeros_like(x)
+    v_kp = np.zeros_like(x)
+    for i in range(num_atoms):
+        center = i * lattice_const
+        v_real -= 1.0 / np.maximum(np.abs(x - center), 1e-3)
+        v_kp = np.where((x >= center - well_width / 2) & (x <= center + well_width / 2), v0, v_kp)
+    return v_real, v_kp
+
+
+def bench_lattice_potential(sizes=(5, 100, 1000), points_per_atom=200):
+    rows = []
+    for num_atoms in sizes:
+        lattice_const = 20.0
+        x = np.linspace(-2, (num_atoms - 1) * lattice_const + 2, num_atoms * points_per_atom)
+        v_real, v_kp = np.empty_like(x), np.empty_like(x)
+
+        def builder():
+            lattice_potential.coulomb_chain(x, num_atoms, lattice_const, out=v_real)
+            centers = lattice_potential.chain_centers(num_atoms, lattice_const)
+            lattice_potential.kp_wells(x, centers, 1.0, -20.0, out=v_kp)
+
+        t_loop = best_time(loop_lattice_potentials, x, num_atoms, lattice_const, 1.0, -20.0)
+        t_builder = best_time(builder)
+        rows.append([num_atoms, len(x), f"{t_loop:.4f}", f"{t_builder:.4f}", f"{t_loop / t_builder:.1f}x"])
+    print("Coulomb chain and Kronig-Penney wells")
+    print_table(["atoms", "grid", "loop (s)", "builder (s)", "speedup"], rows)
+
+
+# --- Finite-difference eigenstates ---
+
+def bench_schrodinger_fd(sizes=(2000, 20000, 100000), n_states=10):
+    from scipy.linalg import eigh
+    rows = []
+    for n in sizes:
+        x = np.linspace(-2, 82, n)
+        v = lattice_potential.coulomb_chain(x, 5, 20.0, r_min=1e-3)
+        t_tri = best_time(schrodinger_fd.lowest_states, x, v, n_states, repeat=1)
+        if n <= 2000:
+            diagonal, off_diagonal = schrodinger_fd.hamiltonian_bands(x, v)
+            H = np.diag(diagonal) + np.diag(off_diagonal, 1) + np.diag(off_diagonal, -1)
+            t_dense = f"{best_time(eigh, H, repeat=1):.3f}"
+        else:
+            t_dense = "-"
+        rows.append([n, t_dense, f"{t_tri:.3f}"])
+    print(f"Lowest {n_states} states of the Coulomb chain")
+    print_table(["grid", "dense eigh (s)", "tridiagonal (s)"], rows)
+
+
+# --- Wavepacket propagation ---
+
+def bench_wavepacket(grid_size=1024, n_steps=20):
+    backends = ['scipy'] + (['pyfftw'] if importlib.util.find_spec('pyfftw') else [])
+    rows = []
+    for backend in backends:
+        for dtype in (np.complex128, np.complex64):
+            propagator = wavepacket.double_slit_propagator(grid_size, backend=backend, dtype=dtype)
+            propagator.advance(1)
+            elapsed = best_time(propagator.advance, n_steps, repeat=1)
+            rows.append([backend, np.dtype(dtype).name, f"{n_steps / elapsed * 60:.0f}"])
+    print(f"Split-step double slit on a {grid_size}x{grid_size} grid")
+    print_table(["backend", "dtype", "steps/min"], rows)
+
+
+# --- 2D wave animation ---
+
+def original_calculate_wave(grid_size=400, width=20.0, height=10.0, wavelength=0.5, slit_dist=1.5,
+                            slit_x=4.0):
+    """calculate_wave as originally written in 2d_wave.py"""
+    x = np.linspace(0, width, grid_size)
+    y = np.linspace(0, height, grid_size)
+    X, Y = np.meshgrid(x, y)
+    k = 2 * np.pi / wavelength
+    wave_before = np.cos(k * X)
+    s1_y, s2_y = height/2 - slit_dist/2, height/2 + slit_dist/2
+    r1 = np.sqrt((X - slit_x)**2 + (Y - s1_y)**2)
+    r2 = np.sqrt((X - slit_x)**2 + (Y - s2_y)**2)
+    wave_after = (np.cos(k * r1) / np.sqrt(r1 + 0.1)) + (np.cos(k * r2) / np.sqrt(r2 + 0.1))
+    return np.where(X < slit_x, wave_before, wave_after)
+
+
+def bench_wave_field(grid_size=400, n_wavelengths=32):
+    field = wave_field.DoubleSlitField(grid_size)
+    reference = original_calculate_wave(grid_size)
+    assert np.array_equal(field.evaluate(0.5), reference)
+    wavelengths = np.linspace(0.3, 0.8, n_wavelengths)
+    t_loop = best_time(lambda: [original_calculate_wave(grid_size, wavelength=w) for w in wavelengths])
+    t_single = best_time(lambda: [field.evaluate(w) for w in wavelengths])
+    t_stack = best_time(field.evaluate, wavelengths)
+    print(f"Double-slit field, {n_wavelengths} wavelengths on {grid_size}x{grid_size}")
+    print_table(["method", "time (s)", "speedup"],
+                [["original loop", f"{t_loop:.3f}", "1.0"],
+                 ["cached geometry", f"{t_single:.3f}", f"{t_loop / t_single:.1f}"],
+                 ["wavelength stack", f"{t_stack:.3f}", f"{t_loop / t_stack:.1f}"]])
+
+
+def summed_slits_intensity(x, wavelength, L, n_slits, slit_dist, slit_width):
+    """Far field as a sum of one complex amplitude per slit"""
+    f = np.sin(np.arctan(x / L)) / wavelength
+    amplitude = np.zeros_like(f, dtype=complex)
+    for center in diffraction.grating_centers(n_slits, slit_dist):
+        amplitude += np.exp(-2j * np.pi * f * center)
+    return (np.sinc(slit_width * f) * np.abs(amplitude) / n_slits)**2
+
+
+def bench_diffraction(slit_counts=(2, 100, 2000), n_screen=3000, samples_per_slit=40, pad=8):
+    wavelength, L, d, a = 0.2e-3, 1.0, 0.01, 0.002
+    x = np.linspace(-0.06, 0.06, n_screen)
+    rows = []
+    for n_slits in slit_counts:
+        dx = a / samples_per_slit
+        grid = np.arange(-(n_slits + 1) * d / 2, (n_slits + 1) * d / 2, dx)
+        exact = diffraction.n_slit_intensity(x, wavelength, L, n_slits, d, a)
+        t_exact = best_time(diffraction.n_slit_intensity, x, wavelength, L, n_slits, d, a)
+        t_sum = best_time(summed_slits_intensity, x, wavelength, L, n_slits, d, a)
+        aperture = diffraction.slit_mask(grid, diffraction.grating_centers(n_slits, d), a)
+        t_fft = best_time(diffraction.fraunhofer_screen, aperture, dx, (x,), wavelength, L, pad)
+        error = np.nanmax(np.abs(diffraction.fraunhofer_screen(aperture, dx, (x,), wavelength, L, pad)
+                                 - exact))
+        assert error < 0.02, f"FFT pattern of {n_slits} slits off the closed form by {error:.1e}"
+        rows.append([n_slits, len(grid), f"{t_exact:.4f}", f"{t_sum:.4f}", f"{t_fft:.4f}",
+                     f"{error:.1e}"])
+    print(f"N-slit Fraunhofer pattern on {n_screen} screen points (pad = {pad})")
+    print_table(["slits", "aperture points", "closed form (s)", "slit sum (s)", "FFT (s)",
+                 "FFT max error"], rows)
+
+    wavelengths = np.linspace(0.1e-3, 0.3e-3, 8)
+    distances = np.linspace(0.5, 2.0, 8)
+    dx = a / samples_per_slit
+    grid = np.arange(-d, d, dx)
+    aperture = diffraction.slit_mask(grid, diffraction.grating_centers(2, d), a)
+    t_batch = best_time(diffraction.fraunhofer_screen, aperture, dx, (x,), wavelengths, distances, pad)
+    t_near = best_time(diffraction.fresnel, aperture, dx, wavelengths, distances / 1000)
+    print(f"Two slits, {len(wavelengths)} wavelengths x {len(distances)} distances: "
+          f"far field {t_batch:.3f} s, near field {t_near:.3f} s")
+
+
+def bench_sampling(sizes=(10**4, 10**6, 10**7), n_grid=5000):
+    x = np.linspace(-0.06, 0.06, n_grid)
+    pdf = diffraction.two_slit_intensity(x, 0.2e-3, 1.0, 0.01, 0.002)
+    p_choice = pdf / pdf.sum()
+    samplers = {method: sampling.GridSampler(x, pdf, method) for method in ("cdf", "alias")}
+    rows = []
+    for n in sizes:
+        t_choice = best_time(np.random.choice, x, size=n, p=p_choice)
+        t_cdf = best_time(samplers["cdf"].sample, n, 0)
+        t_alias = best_time(samplers["alias"].sample, n, 0)
+        t_threads = best_time(samplers["cdf"].sample_parallel, n, 0)
+        rows.append([n, f"{t_choice:.4f}", f"{t_cdf:.4f}", f"{t_alias:.4f}", f"{t_threads:.4f}",
+                     f"{t_choice / t_cdf:.1f}"])
+    print(f"Detections from a {n_grid}-point PDF ({os.cpu_count()} threads for the parallel sampler)")
+    print_table(["samples", "random.choice (s)", "cdf (s)", "alias (s)", "cdf threads (s)",
+                 "speedup"], rows)
+
+
+def bench_buildup(sizes=(10**6, 10**7), n_bins=150, chunk_size=2**20):
+    x = np.linspace(-0.06, 0.06, 5000)
+    sampler = sampling.GridSampler(x, diffraction.two_slit_intensity(x, 0.2e-3, 1.0, 0.01, 0.002))
+    edges = np.linspace(x[0], x[-1], n_bins + 1)
+    rows = []
+    for n in sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        np.histogram(sampler.sample(n, 0, chunk_size), bins=edges)
+        t_full = time.perf_counter() - start
+        peak_full = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        buildup.buildup(sampler, x[0], x[-1], n_bins, buildup.decade_checkpoints(n), 0, 1, chunk_size)
+        t_stream = time.perf_counter() - start
+        peak_stream = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        t_workers = best_time(buildup.buildup, sampler, x[0], x[-1], n_bins,
+                              buildup.decade_checkpoints(n), 0, None, chunk_size, repeat=1)
+        rows.append([n, f"{t_full:.3f}", f"{peak_full / 1e6:.0f}", f"{t_stream:.3f}",
+                     f"{peak_stream / 1e6:.0f}", f"{t_workers:.3f}"])
+    print(f"Pattern build-up into {n_bins} bins, snapshots every decade "
+          f"({os.cpu_count()} processes for the parallel run)")
+    print_table(["detections", "sample + histogram (s)", "peak (MB)", "streaming (s)", "peak (MB)",
+                 "processes (s)"], rows)
+
+
+def bench_array_cache(sizes=(10**4, 10**6), n_materials=100):
+    rng = np.random.default_rng(0)
+    a = rng.uniform(3, 6, n_materials) * 1e-10
+    V_0 = -rng.uniform(4, 40, n_materials) * eV
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cached = array_cache.disk_cache(kp_bands.kp_condition, cache_dir=tmp)
+        for n_E in sizes:
+            E = np.linspace(0, 100 * eV, n_E)
+            # Every variant reads the whole result, which a memory-mapped hit only does here
+            start = time.perf_counter()
+            cached(E, a, 0.1 * a, V_0).sum()
+            t_cold = time.perf_counter() - start
+            t_warm = best_time(lambda: cached(E, a, 0.1 * a, V_0).sum())
+            t_plain = best_time(lambda: kp_bands.kp_condition(E, a, 0.1 * a, V_0).sum())
+            rows.append([n_E, f"{n_materials * n_E * 8 / 1e6:.0f}", f"{t_plain:.4f}",
+                         f"{t_cold:.4f}", f"{t_warm:.5f}", f"{t_plain / t_warm:.0f}"])
+    print(f"On-disk cache of kp_condition for {n_materials} crystals (memory-mapped hits, summed)")
+    print_table(["energies", "result (MB)", "compute (s)", "miss + store (s)", "hit (s)", "speedup"],
+                rows)
+
+
+def bench_latex_figures():
+    import matplotlib
+    matplotlib.use("Agg")
+    import landaubeta
+    import latex_figures
+
+    engines = ["mathtext"]
+    if shutil.which("latex"):
+        engines.insert(0, "usetex")
+    if shutil.which("pdflatex"):
+        engines.append("pgf")
+    # The TeX cache location reaches matplotlib through the environment,
+    # so every run renders in a fresh spawned process
+    names = ("ARRAY_CACHE", "MPLCONFIGDIR", "TEXMFVAR")
+    previous = {name: os.environ.get(name) for name in names}
+    os.environ["ARRAY_CACHE"] = "0"
+    spawn = multiprocessing.get_context("spawn")
+    rows = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            landaubeta.set_tex_cache(os.path.join(tmp, "tex"))
+            for engine in engines:
+                for run in ("cold", "warm"):
+                    with ProcessPoolExecutor(1, mp_context=spawn, initializer=landaubeta.set_text_engine,
+                                             initargs=(engine,)) as pool:
+                        # Imports the figure modules before the clock starts
+                        pool.submit(latex_figures.read_stamps, tmp).result()
+                        start = time.perf_counter()
+                        timing = pool.submit(latex_figures.render_figures,
+                                             directory=os.path.join(tmp, engine)).result()
+                        elapsed = time.perf_counter() - start
+                    rows.append([engine, run, f"{elapsed:.2f}", timing["labels"],
+                                 f"{timing['prewarm']:.2f}", f"{timing['save']:.2f}"])
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    print(f"Essay figures ({len(latex_figures.FIGURES)} PDFs) rendered in one process per run"
+          + ("" if shutil.which("latex") else "; no LaTeX installed, usetex and pgf skipped"))
+    print_table(["engine", "TeX cache", "total (s)", "unique labels", "prewarm (s)", "save (s)"], rows)
+
+
+def original_latex_table(parameter_list, formatted_list, filename):
+    rows = [f"{name} & {val} \\\\" for name, val in zip(parameter_list, formatted_list)]
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("\n".join(rows))
+
+
+def bench_formatting(sizes=(10**4, 10**5, 10**6)):
+    import landaubeta
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in sizes:
+        values = rng.normal(size=n) * 10.0**rng.integers(-8, 8, n)
+        errors = np.abs(rng.normal(size=n)) * 10.0**rng.integers(-10, 6, n)
+        names = [f"p_{{{i}}}" for i in range(n)]
+        scalar_latex = lambda: [landaubeta.latex_format(v, e) for v, e in zip(values, errors)]
+        scalar_pairs = lambda: [landaubeta.format_value_error(v, e) for v, e in zip(values, errors)]
+        formatted = landaubeta.latex_format_array(values, errors)
+        assert formatted.tolist() == scalar_latex()
+        assert list(zip(*landaubeta.format_value_error_array(values, errors))) == scalar_pairs()
+        t_latex = best_time(scalar_latex, repeat=1)
+        t_latex_array = best_time(landaubeta.latex_format_array, values, errors, repeat=1)
+        t_pairs = best_time(scalar_pairs, repeat=1)
+        t_pairs_array = best_time(landaubeta.format_value_error_array, values, errors, repeat=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            old_path, new_path = os.path.join(tmp, "old.tex"), os.path.join(tmp, "new.tex")
+            t_join = best_time(original_latex_table, names, formatted, old_path, repeat=1)
+            t_stream = best_time(landaubeta.latex_table_scientific, names, formatted, new_path,
+                                 repeat=1)
+            peaks = []
+            for write, path in ((original_latex_table, old_path),
+                                (landaubeta.latex_table_scientific, new_path)):
+                tracemalloc.start()
+                write(names, formatted, path)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            with open(old_path, 'rb') as old, open(new_path, 'rb') as new:
+                assert old.read() == new.read()
+        rows.append([n, f"{t_latex:.3f}", f"{t_latex_array:.3f}", f"{t_pairs:.3f}",
+                     f"{t_pairs_array:.3f}", f"{t_join:.3f}", f"{t_stream:.3f}", f"{peaks[0] / 1e6:.1f}",
+                     f"{peaks[1] / 1e6:.1f}"])
+    print("Value/error formatting: scalar loop vs grouped arrays (identical output)")
+    print_table(["rows", "latex_format (s)", "array (s)", "format_value_error (s)", "array (s)",
+                 "join+write (s)", "streamed (s)", "join peak (MB)", "stream peak (MB)"], rows)
+
+
+def bench_chi2_batch(sizes=(10**4, 10**5, 10**6), n_points=50, n_loop=10**4):
+    import landaubeta
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, n_points)
+    y_err = np.full(n_points, 0.5)
+    y = 2 * x + 1 + rng.normal(0, 0.5, n_points)
+    line = lambda x, a, b: a * x + b
+    rows = []
+    for n in sizes:
+        popts = np.array([2.0, 1.0]) + rng.normal(0, 0.05, (n, 2))
+        loop = lambda: [landaubeta.calculate_p_value_chi(x, y, line, p, y_err) for p in popts[:n_loop]]
+        reference = np.array([result[:2] for result in loop()])
+        stats = landaubeta.calculate_p_value_chi_batch(x, y, line, popts, y_err)
+        assert np.allclose(stats['chi2'][:n_loop], reference[:, 1])
+        assert np.allclose(stats['p'][:n_loop], reference[:, 0])
+        t_loop = best_time(loop, repeat=1) * n / min(n, n_loop)
+        t_batch = best_time(landaubeta.calculate_p_value_chi_batch, x, y, line, popts, y_err,
+                            repeat=1)
+        # Ragged: every fit keeps a random number of leading points
+        lengths = rng.integers(n_points // 2, n_points + 1, n)
+        mask = np.arange(n_points) >= lengths[:, None]
+        t_masked = best_time(landaubeta.calculate_p_value_chi_batch, x, y, line, popts, y_err, mask,
+                             repeat=1)
+        rows.append([n, f"{t_loop:.2f}", f"{t_batch:.3f}", f"{t_loop / t_batch:.0f}x",
+                     f"{t_masked:.3f}"])
+    print(f"Chi-squared and p-values of a line fit to {n_points} points, one per parameter vector "
+          f"(loop timed on {n_loop} fits and scaled)")
+    print_table(["fits", "loop (s)", "batch (s)", "speedup", "masked batch (s)"], rows)
+
+
+def exponential_decay(x, a, k, c):
+    return a * np.exp(-k * x) + c
+
+
+def bench_resampling(sizes=(1000, 10000), n_points=40):
+    from scipy.optimize import curve_fit
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 5, n_points)
+    y_err = np.full(n_points, 0.1)
+    y = exponential_decay(x, 3.0, 1.2, 0.5) + rng.normal(0, 0.1, n_points)
+    _, pcov = curve_fit(exponential_decay, x, y, p0=[1, 1, 0], sigma=y_err, absolute_sigma=True)
+    n_cpus = os.cpu_count() or 1
+    rows = []
+    for n in sizes:
+        for method in ("bootstrap", "monte_carlo"):
+            t_serial = best_time(resampling.resample_fit, x, y, exponential_decay, [1, 1, 0], y_err, n,
+                                 method, seed=0, n_workers=1, repeat=1)
+            t_pool = best_time(resampling.resample_fit, x, y, exponential_decay, [1, 1, 0], y_err, n,
+                               method, seed=0, n_workers=n_cpus, repeat=1)
+            tracemalloc.start()
+            result = resampling.resample_fit(x, y, exponential_decay, [1, 1, 0], y_err, n, method,
+                                             seed=0, n_workers=1, absolute_sigma=True)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            ratio = result.perr / np.sqrt(np.diag(pcov))
+            rows.append([n, method, f"{n / t_serial:.0f}", f"{n / t_pool:.0f}", f"{peak / 1e6:.2f}",
+                         " ".join(f"{r:.2f}" for r in ratio), result.n_failed])
+    print(f"Refits of a*exp(-kx) + c to {n_points} points, {n_cpus} processes in the pool")
+    print_table(["refits", "method", "fits/s (1 proc)", "fits/s (pool)", "peak memory (MB)",
+                 "perr / curve_fit perr", "failed"], rows)
+
+
+def import_time_ms(statement, repeat=5):
+    """Best time of the imports run by statement in a fresh interpreter, from python -X importtime"""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def total(code):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=here, env=env,
+                                capture_output=True, text=True, check=True).stderr
+        microseconds = 0
+        for line in stderr.splitlines():
+            if line.startswith("import time:"):
+                _, cumulative, name = line.split("|")
+                # Top-level imports only: nested ones are included in their parent's cumulative time
+                if cumulative.strip().isdigit() and not name.startswith("  "):
+                    microseconds += int(cumulative)
+        return microseconds
+
+    total(statement)  # writes the bytecode caches
+    startup = min(total("pass") for _ in range(repeat))
+    return (min(total(statement) for _ in range(repeat)) - startup) / 1000
+
+
+def bench_import_time(budgets=None):
+    # Deterministic, unlike the times: importing landaubeta loads no heavy package
+    loaded = subprocess.run([sys.executable, "-c", "import sys, landaubeta; print(*sorted(sys.modules))"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True,
+                            text=True, check=True).stdout.split()
+    heavy = [name for name in ("numpy", "matplotlib", "scipy", "pandas") if name in loaded]
+    assert not heavy, f"import landaubeta imports {', '.join(heavy)}"
+
+    # Machine-dependent: going over a budget is reported, not fatal
+    budgets = budgets or {
+        "import landaubeta": 50,
+        "from landaubeta import use_latex_fonts; use_latex_fonts()": 600,
+    }
+    eager = "import matplotlib.pyplot, numpy, scipy.stats, scipy.special, pandas"
+    rows = []
+    for statement, budget in budgets.items():
+        elapsed = import_time_ms(statement)
+        rows.append([statement, f"{elapsed:.1f}", budget, "ok" if elapsed <= budget else "OVER"])
+        if elapsed > budget:
+            regressions.append(f"import time: {statement} took {elapsed:.0f} ms (budget {budget} ms)")
+    rows.append([f"{eager} (eager, before)", f"{import_time_ms(eager):.1f}", "", ""])
+    print("Cold import time of landaubeta (python -X importtime, best of 5, bytecode cached)")
+    print_table(["statement", "imports (ms)", "budget (ms)", ""], rows)
+
+
+def traced(func, *args, **kwargs):
+    """(seconds, peak traced memory in bytes, result) of one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def bench_tiled_wave(sizes=(400, 4000, 10000), full_limit=4000, tile_size=1024):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for grid_size in sizes:
+            field = wave_field.DoubleSlitField(grid_size)
+            if grid_size <= full_limit:
+                elapsed, peak, full = traced(field.evaluate, 0.5)
+                rows.append([grid_size, "evaluate", "float64", f"{elapsed:.2f}", f"{peak / 1e6:.0f}", ""])
+                elapsed, peak, tiled = traced(field.evaluate_tiled, 0.5, tile_size=tile_size)
+                assert np.array_equal(tiled, full)
+                if grid_size == 400:
+                    assert np.array_equal(tiled, original_calculate_wave(grid_size))
+                rows.append([grid_size, "tiled", "float64", f"{elapsed:.2f}", f"{peak / 1e6:.0f}", ""])
+                del full, tiled
+            path = os.path.join(tmp, f"wave_{grid_size}.npy")
+            elapsed, peak, _ = traced(field.evaluate_tiled, 0.5, out=path, tile_size=tile_size,
+                                      dtype=np.float32)
+            rows.append([grid_size, "tiled to memmap", "float32", f"{elapsed:.2f}", f"{peak / 1e6:.0f}",
+                         f"{os.path.getsize(path) / 1e6:.0f}"])
+            os.remove(path)
+    print(f"Double-slit field on grid_size^2 points, {tile_size}^2 tiles over {os.cpu_count()} threads "
+          "(tiled float64 is bit-identical to evaluate and to the original script)")
+    print_table(["grid", "method", "dtype", "time (s)", "peak heap (MB)", "file (MB)"], rows)
+
+
+def naive_epm_bands(crystal, k_points, n_bands, g2_max):
+    """Basis and potential rebuilt and every eigenvalue computed at each k"""
+    energies = [np.linalg.eigvalsh(pseudopotential.BandSolver(crystal, g2_max).hamiltonian(k))[:n_bands]
+                for k in k_points]
+    return np.array(energies) * pseudopotential.Ry
+
+
+def bench_pseudopotential(cases=((21, 200), (60, 60), (150, 20)), n_bands=8):
+    crystal = pseudopotential.CRYSTALS["Si"]
+    n_cpus = os.cpu_count() or 1
+    rows = []
+    for g2_max, n_points in cases:
+        k, _, _, _ = pseudopotential.fcc_path(n_points=n_points)
+        solver = pseudopotential.BandSolver(crystal, g2_max)
+        reference = solver.bands(k, n_bands, "eigh")
+        assert np.allclose(solver.bands(k, n_bands, "lobpcg"), reference, atol=1e-6)
+        t_naive = best_time(naive_epm_bands, crystal, k, n_bands, g2_max, repeat=1)
+        t_eigh = best_time(pseudopotential.band_structure, crystal, k, n_bands, g2_max, "eigh", 1,
+                           repeat=1)
+        t_lobpcg = best_time(pseudopotential.band_structure, crystal, k, n_bands, g2_max, "lobpcg", 1,
+                             repeat=1)
+        t_pool = best_time(pseudopotential.band_structure, crystal, k, n_bands, g2_max, "auto", n_cpus,
+                           repeat=1)
+        rows.append([g2_max, solver.n_plane_waves, len(k), f"{t_naive:.2f}", f"{t_eigh:.2f}",
+                     f"{t_lobpcg:.2f}", f"{t_pool:.2f}"])
+    print(f"Si pseudopotential bands ({n_bands} lowest) along L-G-X-U|K-G, pool of {n_cpus} processes")
+    print_table(["|G|^2 max", "plane waves", "k-points", "naive (s)", "eigh subset (s)",
+                 "lobpcg (s)", "auto, pool (s)"], rows)
+
+
+def bench_decimation(scene_names=("kp_condition", "interference_pattern", "interference_histogram",
+                                   "kp_potential", "potential_barrier"), repeat=3):
+    import io
+    import matplotlib
+    matplotlib.use("Agg")
+    import landaubeta
+    import scenes
+
+    previous = landaubeta.decimation, landaubeta.text_engine
+    landaubeta.set_text_engine("mathtext")
+    rows = []
+    try:
+        with matplotlib.rc_context(landaubeta.latex_fonts_params()):
+            for name in scene_names:
+                scene = scenes.SCENES[name]
+                result = scene.compute({})
+                row = [name]
+                for decimation in (False, True):
+                    landaubeta.decimation = decimation
+                    fig = scene.render(result, {})
+                    vertices = sum(len(line.get_xdata()) for ax in fig.axes for line in ax.lines)
+                    buffer = io.BytesIO()
+
+                    def save():
+                        buffer.seek(0)
+                        buffer.truncate()
+                        fig.savefig(buffer, format="pdf")
+
+                    t_save = best_time(save, repeat=repeat)
+                    size = buffer.getbuffer().nbytes
+                    with matplotlib.rc_context({"path.simplify": False}):
+                        save()
+                    row += [vertices, f"{t_save:.3f}", f"{size / 1e3:.1f}",
+                            f"{buffer.getbuffer().nbytes / 1e3:.1f}"]
+                rows.append(row)
+    finally:
+        landaubeta.decimation = previous[0]
+        landaubeta.set_text_engine(previous[1])
+    print("savefig to PDF (mathtext) of the scenes with full lines vs lines decimated to the axes "
+          "resolution; 'unsimplified' turns matplotlib's own path.simplify off")
+    print_table(["scene", "vertices", "savefig (s)", "PDF (kB)", "unsimplified (kB)",
+                 "decimated vertices", "savefig (s)", "PDF (kB)", "unsimplified (kB)"], rows)
+
+
+# --- Recorded kernel suite ---
+
+HISTORY_FILE = "benchmark_history.jsonl"
+
+
+def kp_condition_kernel(n_materials, n_energies=20000):
+    """Band condition of plot_figures.py for n_materials crystals"""
+    rng = np.random.default_rng(0)
+    E = np.linspace(0, 100 * eV, n_energies)
+    a_values = rng.uniform(3, 6, n_materials) * 1e-10
+    b_values = .1 * a_values
+    V_0_values = -rng.uniform(4, 40, n_materials) * eV
+    return lambda: kp_bands.kp_condition(E, a_values, b_values, V_0_values)
+
+
+def calculate_wave_kernel(grid_size):
+    """calculate_wave of 2d_wave.py on a grid_size x grid_size grid, geometry included"""
+    return lambda: wave_field.DoubleSlitField(grid_size).evaluate(0.5)
+
+
+def intensity_kernel(n_points):
+    """sinc^2 cos^2 two-slit intensity of the interference scripts"""
+    x = np.linspace(-0.06, 0.06, n_points)
+    return lambda: diffraction.two_slit_intensity(x, 0.2e-3, 1.0, 0.01, 0.002)
+
+
+def detections_kernel(n_samples, n_grid=5000):
+    """Sampling of the interference_histogram.py detections (np.random.choice originally)"""
+    x = np.linspace(-0.06, 0.06, n_grid)
+    pdf = diffraction.two_slit_intensity(x, 0.2e-3, 1.0, 0.01, 0.002)
+    return lambda: sampling.GridSampler(x, pdf).sample(n_samples, 0)
+
+
+def lattice_potentials_kernel(num_atoms, points_per_atom=200, lattice_const=20.0):
+    """Coulomb chain and Kronig-Penney wells of kp-potential*.py"""
+    x = np.linspace(-2, (num_atoms - 1) * lattice_const + 2, num_atoms * points_per_atom)
+
+    def build():
+        centers = lattice_potential.chain_centers(num_atoms, lattice_const)
+        return (lattice_potential.coulomb_chain(x, num_atoms, lattice_const),
+                lattice_potential.kp_wells(x, centers, 1.0, -20.0))
+    return build
+
+
+# name: (size unit, sizes, function of the size returning the call to measure)
+KERNELS = {
+    "kp_condition": ("materials", (3, 100, 1000), kp_condition_kernel),
+    "calculate_wave": ("grid size", (400, 1000, 2000), calculate_wave_kernel),
+    "two_slit_intensity": ("points", (5000, 10**5, 10**6), intensity_kernel),
+    "detections": ("samples", (5000, 10**5, 10**6), detections_kernel),
+    "lattice_potentials": ("atoms", (5, 100, 1000), lattice_potentials_kernel),
+}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where resource is missing)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def measure_kernel(kernel, size, repeat=3):
+    """
+    Best wall time of repeat calls of one kernel after a warm-up call, the
+    peak RSS reached and its increase over the RSS after setup, and, from
+    a separate call under tracemalloc, the peak traced memory and the
+    number of blocks the call left allocated (its result and caches).
+    Meant to run in a fresh process, so the RSS is that of this case alone.
+    """
+    func = KERNELS[kernel][2](size)
+    rss_setup = peak_rss_mb()
+    func()
+    seconds = best_time(func, repeat=repeat)
+    rss_peak = peak_rss_mb()
+    tracemalloc.start()
+    result = func()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del result
+    return {"kernel": kernel, "unit": KERNELS[kernel][0], "size": size, "seconds": seconds,
+            "peak_rss_mb": rss_peak,
+            "rss_increase_mb": None if rss_peak is None else rss_peak - rss_setup,
+            "traced_peak_mb": traced_peak / 1e6, "live_blocks": blocks}
+
+
+def cpu_model():
+    """Model name of the CPU ('' if unknown)"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment():
+    """
+    When and where a benchmark record was made. host is $BENCHMARK_HOST or
+    the network name; records are compared when host, cpu and cpus match.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit,
+            "python": platform.python_version(), "numpy": np.__version__,
+            "host": os.environ.get("BENCHMARK_HOST") or platform.node(), "cpu": cpu_model(),
+            "cpus": os.cpu_count(), "machine": platform.machine()}
+
+
+def read_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def bench_kernels(names=None, history=HISTORY_FILE, repeat=3):
+    """
+    Measures every size of the named KERNELS (all by default), each in its
+    own process, compares the times with the last record of the same host,
+    CPU and core count in history and appends the new record there as one
+    JSON line (nothing is written if history is None).
+    """
+    environ = environment()
+    same_host = operator.itemgetter("host", "cpu", "cpus")
+    previous = {}
+    for record in read_history(history) if history else []:
+        if record.keys() >= {"host", "cpu", "cpus"} and same_host(record) == same_host(environ):
+            previous.update({(r["kernel"], r["size"]): r["seconds"] for r in record["results"]})
+    results, rows = [], []
+    for kernel in names or KERNELS:
+        for size in KERNELS[kernel][1]:
+            with ProcessPoolExecutor(1) as pool:
+                result = pool.submit(measure_kernel, kernel, size, repeat).result()
+            results.append(result)
+            last = previous.get((kernel, size))
+            rss = result["peak_rss_mb"]
+            rows.append([kernel, f"{size} {result['unit']}", f"{result['seconds']:.4f}",
+                         "-" if rss is None else f"{rss:.0f} (+{result['rss_increase_mb']:.0f})",
+                         f"{result['traced_peak_mb']:.1f}", result["live_blocks"],
+                         "-" if last is None else f"{result['seconds'] / last:.2f}x"])
+    print(f"Compute kernels, one process per case (commit {environ['commit']})")
+    print_table(["kernel", "size", "time (s)", "peak RSS (MB)", "traced peak (MB)", "live blocks",
+                 "vs last"], rows)
+    if history:
+        with open(history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(environ, results=results)) + "\n")
+        print(f"Appended to {history}")
+
+
+def bench_wave_animation(frame_counts=(50, 500), grid_size=400):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frames.npy")
+        for n_frames in frame_counts:
+            tracemalloc.start()
+            start = time.perf_counter()
+            frames = wave_animation.double_slit_frames(n_frames, grid_size=grid_size)
+            wave_animation.write_npy(frames, path, n_frames, (grid_size, grid_size))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append([n_frames, f"{n_frames / elapsed:.0f}", f"{peak / 1e6:.1f}",
+                         f"{os.path.getsize(path) / 1e6:.0f}"])
+    print(f"Double-slit animation streamed to .npy ({grid_size}x{grid_size})")
+    print_table(["frames", "frames/s", "peak memory (MB)", "file (MB)"], rows)
+
+
+BENCHMARKS = {
+    "kp_bands": bench_kp_bands,
+    "band_edges": bench_band_edges,
+    "dispersion": bench_dispersion,
+    "transfer_matrix": bench_transfer_matrix,
+    "lattice_potential": bench_lattice_potential,
+    "schrodinger_fd": bench_schrodinger_fd,
+    "wavepacket": bench_wavepacket,
+    "wave_field": bench_wave_field,
+    "diffraction": bench_diffraction,
+    "sampling": bench_sampling,
+    "buildup": bench_buildup,
+    "array_cache": bench_array_cache,
+    "latex_figures": bench_latex_figures,
+    "formatting": bench_formatting,
+    "chi2_batch": bench_chi2_batch,
+    "resampling": bench_resampling,
+    "import_time": bench_import_time,
+    "tiled_wave": bench_tiled_wave,
+    "pseudopotential": bench_pseudopotential,
+    "decimation": bench_decimation,
+    "kernels": bench_kernels,
+    "wave_animation": bench_wave_animation,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the compute kernels")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run, among {', '.join(BENCHMARKS)} "
+                                                 f"(default: all)")
+    parser.add_argument("--history", default=HISTORY_FILE,
+                        help="JSON lines file the kernels benchmark appends to ('' to not record)")
+    args = parser.parse_args()
+    for name in args.names or BENCHMARKS:
+        if name == "kernels":
+            bench_kernels(history=args.history or None)
+        else:
+            BENCHMARKS[name]()
+        print()
+    if regressions:
+        print("Over budget:\n" + "\n".join(f"  {regression}" for regression in regressions))
+        raise SystemExit(1)
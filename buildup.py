@@ -0,0 +1,120 @@
+"""
+Streaming histograms for the build-up of the interference pattern.
+
+Detections are consumed chunk by chunk (for example from
+sampling.GridSampler.chunks) and only the bin counts are kept, so memory
+is O(bins) however many electrons arrive. Bins are uniform, so the bin
+index of every sample is one multiply and a cast, and the counts are
+updated with np.bincount. Snapshots of the counts are taken at exact
+sample numbers (10, 100, ... by default), splitting a chunk where a
+checkpoint falls inside it.
+
+buildup runs the same loop in several processes, each with its own
+random stream and an equal share of every checkpoint, and sums the
+per-process snapshots at the end.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+
+
+def decade_checkpoints(n_samples, start=10):
+    """start, 10 start, 100 start, ... up to n_samples, which is always included"""
+    checkpoints = []
+    n = start
+    while n < n_samples:
+        checkpoints.append(n)
+        n *= 10
+    checkpoints.append(n_samples)
+    return np.array(checkpoints, dtype=np.int64)
+
+
+class StreamingHistogram:
+    """
+    Counts of samples in n_bins uniform bins over [low, high).
+
+    Samples outside the range are counted in self.outside.
+    """
+
+    def __init__(self, low, high, n_bins):
+        self.edges = np.linspace(low, high, n_bins + 1)
+        self.low = float(low)
+        self.scale = n_bins / (high - low)
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.total = 0
+        self.outside = 0
+
+    @property
+    def n_bins(self):
+        return len(self.counts)
+
+    def update(self, samples):
+        """Adds a chunk of samples to the counts"""
+        index = (np.asarray(samples) - self.low) * self.scale
+        inside = (index >= 0) & (index < self.n_bins)
+        index = index[inside].astype(np.intp)
+        self.counts += np.bincount(index, minlength=self.n_bins)
+        self.total += len(inside)
+        self.outside += len(inside) - len(index)
+
+    def snapshots(self, chunks, checkpoints):
+        """
+        Consumes chunks and yields (n, counts) each time the total reaches
+        a checkpoint n. counts is a copy, so snapshots can be stored.
+        """
+        checkpoints = iter(sorted(checkpoints))
+        target = next(checkpoints, None)
+        for chunk in chunks:
+            while target is not None and len(chunk) >= target - self.total:
+                head = target - self.total
+                self.update(chunk[:head])
+                chunk = chunk[head:]
+                yield target, self.counts.copy()
+                target = next(checkpoints, None)
+            self.update(chunk)
+
+    def density(self):
+        """Counts normalised to unit area, as plt.hist(density=True)"""
+        inside = self.counts.sum()
+        return self.counts * (self.scale / inside) if inside else np.zeros(self.n_bins)
+
+
+def _worker_snapshots(sampler, low, high, n_bins, checkpoints, seed, chunk_size):
+    histogram = StreamingHistogram(low, high, n_bins)
+    chunks = sampler.chunks(int(checkpoints[-1]), seed, chunk_size)
+    counts = np.zeros((len(checkpoints), n_bins), dtype=np.int64)
+    for i, (_, snapshot) in enumerate(histogram.snapshots(chunks, checkpoints)):
+        counts[i] = snapshot
+    return counts
+
+
+def buildup(sampler, low, high, n_bins, checkpoints, seed=None, n_workers=None, chunk_size=2**20):
+    """
+    Histogram counts of sampler after each number of detections in
+    checkpoints, as an array (len(checkpoints), n_bins).
+
+    Every checkpoint is split into equal shares between n_workers
+    processes (os.cpu_count() by default), each drawing from its own
+    stream of SeedSequence(seed).spawn(n_workers), and the shares are
+    summed. The union of independent draws is again an independent draw,
+    so each row is a histogram of exactly that many detections.
+    """
+    checkpoints = np.asarray(checkpoints, dtype=np.int64)
+    n_workers = n_workers or os.cpu_count() or 1
+    # Worker w takes c // n samples, plus one if w < c % n, of checkpoint c,
+    # which keeps every worker's shares increasing
+    workers = np.arange(n_workers)[:, None]
+    shares = checkpoints // n_workers + (workers < checkpoints % n_workers)
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    if n_workers == 1:
+        return _worker_snapshots(sampler, low, high, n_bins, shares[0], seeds[0], chunk_size)
+
+    counts = np.zeros((len(checkpoints), n_bins), dtype=np.int64)
+    with ProcessPoolExecutor(n_workers) as pool:
+        jobs = [pool.submit(_worker_snapshots, sampler, low, high, n_bins, share, worker_seed,
+                            chunk_size)
+                for share, worker_seed in zip(shares, seeds)]
+        for job in jobs:
+            counts += job.result()
+    return counts
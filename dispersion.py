@@ -0,0 +1,88 @@
+"""
+Kronig-Penney dispersion relation E(k) across the first Brillouin zone.
+
+Every allowed band from kp_bands.band_edges is inverted through
+f(E) = cos(ka), which is monotone inside a band, so cost and memory scale
+with the number of k-points rather than with a dense energy grid.
+Wave numbers are reduced, ka/pi in [0, 1], so crystals with different
+lattice constants share one k-grid.
+"""
+
+import numpy as np
+
+import kp_bands
+from kp_bands import eV
+
+
+def band_energies(k_reduced, rows, bands, a_values, b_values, V_0_values, xtol=1e-12 * eV):
+    """
+    E(k) for each band at the reduced wave numbers k_reduced = ka/pi.
+
+    rows and bands are the output of kp_bands.band_edges for the same
+    crystals. Returns an (n_bands, n_k) array in J; points that a band
+    clipped at E_max does not reach are NaN.
+    """
+    a_values, b_values, V_0_values = np.broadcast_arrays(
+        np.atleast_1d(a_values), np.atleast_1d(b_values), np.atleast_1d(V_0_values))
+    target = np.cos(np.pi * np.asarray(k_reduced, dtype=float))
+    return kp_bands.invert_condition(
+        target[None, :], bands[:, :1], bands[:, 1:],
+        a_values[rows, None], b_values[rows, None], V_0_values[rows, None], xtol=xtol)
+
+
+def dispersion(a_values, b_values, V_0_values, E_max, n_k=101, n_scan=1000, xtol=1e-12 * eV):
+    """
+    Band structure on a uniform grid of n_k reduced wave numbers.
+
+    Returns (k_reduced, rows, E): the ka/pi grid, the crystal index of each
+    band and the (n_bands, n_k) energies in J.
+    """
+    rows, bands = kp_bands.band_edges(a_values, b_values, V_0_values, E_max,
+                                      n_scan=n_scan, xtol=xtol)
+    k_reduced = np.linspace(0, 1, n_k)
+    E = band_energies(k_reduced, rows, bands, a_values, b_values, V_0_values, xtol=xtol)
+    return k_reduced, rows, E
+
+
+def adaptive_dispersion(a_values, b_values, V_0_values, E_max, n_k=17, tol=1e-3 * eV,
+                        max_points=4097, n_scan=1000, xtol=1e-12 * eV):
+    """
+    Band structure on a k-grid refined where E(k) bends the most.
+
+    Starting from n_k uniform points, every interval whose midpoint energy
+    differs from the linear interpolation by more than tol (in J) for any
+    band is split, and only the new halves are checked again. This puts
+    the extra points near the band edges, where E(k) is curved, and stops
+    once every interval passes or max_points is reached.
+
+    Returns (k_reduced, rows, E) like dispersion, with a non-uniform k-grid
+    shared by all bands.
+    """
+    rows, bands = kp_bands.band_edges(a_values, b_values, V_0_values, E_max,
+                                      n_scan=n_scan, xtol=xtol)
+    k_reduced = np.linspace(0, 1, n_k)
+    E = band_energies(k_reduced, rows, bands, a_values, b_values, V_0_values, xtol=xtol)
+
+    active = np.ones(n_k - 1, dtype=bool)
+    while active.any() and len(k_reduced) < max_points:
+        idx = np.nonzero(active)[0][:max_points - len(k_reduced)]
+        k_mid = 0.5 * (k_reduced[idx] + k_reduced[idx + 1])
+        E_mid = band_energies(k_mid, rows, bands, a_values, b_values, V_0_values, xtol=xtol)
+
+        deviation = np.abs(E_mid - 0.5 * (E[:, idx] + E[:, idx + 1]))
+        split = np.nan_to_num(deviation).max(axis=0, initial=0) > tol
+        if not split.any():
+            break
+
+        # Interval i becomes i + (number of splits before it), plus its new half
+        split_all = np.zeros(len(active), dtype=bool)
+        split_all[idx[split]] = True
+        new_index = np.arange(len(active)) + np.cumsum(split_all) - split_all
+        active = np.zeros(len(active) + split.sum(), dtype=bool)
+        active[new_index[split_all]] = True
+        active[new_index[split_all] + 1] = True
+
+        k_reduced = np.insert(k_reduced, idx[split] + 1, k_mid[split])
+        E = np.insert(E, idx[split] + 1, E_mid[:, split], axis=1)
+
+    return k_reduced, rows, E
@@ -1,61 +1,30 @@
-import numpy as np
-import matplotlib.pyplot as plt
 from landaubeta import use_latex_fonts, use_IEEE_style
+import scenes
+import schrodinger_fd
 # use_latex_fonts()
 use_IEEE_style()
 
-def plot_kp_vs_coulomb():
-    num_atoms = 5
-    lattice_const = 20.0  # Increased spacing between nuclei
-    
-    # Grid for plotting
-    x = np.linspace(-2, (num_atoms - 1) * lattice_const + 2, 5000)
-    
-    # 1. Realistic Potential (Coulomb-like: -1/|x|)
-    # We drop the softening parameter. To avoid division by zero during 
-    # calculation, we use a tiny clipping value (1e-3).
-    v_real = np.zeros_like(x)
-    for i in range(num_atoms):
-        center = i * lattice_const
-        dist = np.abs(x - center)
-        # The potential goes to -infinity at the center
-        v_real -= 1.0 / np.maximum(dist, 1e-3)
+def kp_vs_coulomb_potentials(num_points=5000):
+    # Coulomb-like chain -1/|x| (5 nuclei, spacing 20, clipped at 1e-3) and
+    # its Kronig-Penney approximation (wells of width 1 and depth -20)
+    result = scenes.kp_potential(dict(num_points=num_points))
+    return result['x'], result['v_real'], result['v_kp']
 
-    # 2. Kronig-Penney Approximation
-    # Making the 'step' negative (wells) and increasing its dimensions
-    well_width = 1  # Wider steps
-    v0 = -20.0         # Deeper negative potential
-    
-    v_kp = np.zeros_like(x)
-    for i in range(num_atoms):
-        center = i * lattice_const
-        # Define the rectangular well bounds
-        well_start = center - well_width / 2
-        well_end = center + well_width / 2
-        v_kp = np.where((x >= well_start) & (x <= well_end), v0, v_kp)
+def compare_kp_vs_coulomb_spectra(n_states=10, num_points=100000):
+    """Lowest energies of the realistic chain and of its Kronig-Penney approximation"""
+    x, v_real, v_kp = kp_vs_coulomb_potentials(num_points)
+    E_real, _ = schrodinger_fd.lowest_states(x, v_real, n_states)
+    E_kp, _ = schrodinger_fd.lowest_states(x, v_kp, n_states)
 
-    # Plotting
-    plt.figure(figsize=(12, 6))
-    
-    # Plotting Realistic Potential
-    plt.plot(x, v_real, label=r"Realistic Potential ($-1/|x|$)", color='royalblue', lw=1.5)
-    
-    # Plotting K-P Approximation (Step/Rectangular Wells)
-    plt.step(x, v_kp, label="Kronig-Penney (Negative Wells)", color='crimson', 
-             where='mid', lw=2.5, alpha=0.9)
+    print(f"{'n':>3}  {'Realistic':>12}  {'Kronig-Penney':>14}")
+    for n, (e_real, e_kp) in enumerate(zip(E_real, E_kp)):
+        print(f"{n:>3}  {e_real:>12.4f}  {e_kp:>14.4f}")
+    return E_real, E_kp
 
-    plt.title("Atomic Potential vs. Kronig-Penney Model (Negative Wells)", fontsize=14)
-    plt.xlabel("Position ($x$)", fontsize=12)
-    plt.ylabel("Potential Energy $V(x)$", fontsize=12)
-    plt.axhline(0, color='black', linewidth=0.8, linestyle='--')
-    
-    # Set y-limit to focus on the structure of the wells
-    plt.ylim(-10, 1)
-    plt.legend(loc='lower right')
-    plt.grid(alpha=0.3)
-    
-    plt.tight_layout()
-    plt.show()
+def plot_kp_vs_coulomb(num_points=5000):
+    # Both potentials on one axis, the wells drawn as steps (scenes.py)
+    scenes.show('kp_potential', dict(num_points=num_points))
 
 if __name__ == "__main__":
+    compare_kp_vs_coulomb_spectra()
     plot_kp_vs_coulomb()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Kronig-Penney band condition evaluated for many crystals at once.
+
+The condition f(E) = cos(qa) + (kappa/q) sin(qa) is computed on a
+(materials x energies) array, with the free-electron wave number q shared
+by every crystal on the same energy grid.
+"""
+
+import numpy as np
+
+m = 9.1093837e-31
+hbar = 1.054571817e-34
+eV = 1.160218e-19
+
+
+def wave_number(E):
+    """Free-electron wave number q = sqrt(2mE)/hbar"""
+    return np.sqrt(2 * m * np.asarray(E, dtype=float)) / hbar
+
+
+def kp_condition(E, a_values, b_values, V_0_values, q=None):
+    """
+    Evaluates cos(qa) + kappa/q sin(qa) for every crystal on the grid E.
+
+    a_values, b_values and V_0_values are scalars or 1D arrays of equal
+    length (one entry per crystal). Returns an array of shape
+    (n_materials, len(E)). The q -> 0 limit, 1 + kappa*a, is used at E = 0.
+    This differs from the original per-crystal loop of plot_figures.py,
+    where E = 0 gave NaN (0/0) and so was never counted in a band: E = 0
+    is now inside a band whenever |1 + kappa*a| <= 1.
+    """
+    E = np.asarray(E, dtype=float)
+    if q is None:
+        q = wave_number(E)
+    a = np.atleast_1d(np.asarray(a_values, dtype=float))[:, None]
+    b = np.atleast_1d(np.asarray(b_values, dtype=float))[:, None]
+    V_0 = np.atleast_1d(np.asarray(V_0_values, dtype=float))[:, None]
+    return _condition(q, a, m * b * V_0 / hbar**2)
+
+
+def _condition(q, a, kappa):
+    """cos(qa) + kappa/q sin(qa) with numpy broadcasting of all arguments"""
+    qa = np.multiply(q, a)
+    f = np.sin(qa)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f *= kappa / q
+    f += np.cos(qa, out=qa)
+
+    zero = np.broadcast_to(q == 0, f.shape)
+    if zero.any():
+        f[zero] = np.broadcast_to(1 + kappa * a, f.shape)[zero]
+    return f
+
+
+def allowed_band_masks(E, a_values, b_values, V_0_values, chunk_size=64):
+    """
+    Boolean (n_materials, len(E)) mask of energies inside an allowed band.
+
+    Crystals are processed chunk_size at a time so the float temporaries
+    stay bounded while the whole batch shares one q grid.
+    """
+    E = np.asarray(E, dtype=float)
+    q = wave_number(E)
+    a_values, b_values, V_0_values = np.broadcast_arrays(
+        np.atleast_1d(a_values), np.atleast_1d(b_values), np.atleast_1d(V_0_values))
+    n_materials = len(a_values)
+
+    mask = np.empty((n_materials, len(E)), dtype=bool)
+    for start in range(0, n_materials, chunk_size):
+        stop = start + chunk_size
+        f = kp_condition(E, a_values[start:stop], b_values[start:stop],
+                         V_0_values[start:stop], q=q)
+        np.less_equal(np.abs(f, out=f), 1, out=mask[start:stop])
+    return mask
+
+
+def band_segments(mask):
+    """
+    Contiguous runs of True along the last axis of a 1D or 2D mask.
+
+    Returns (rows, starts, ends) index arrays with inclusive ends; for a 1D
+    mask rows is all zeros.
+    """
+    mask = np.atleast_2d(mask)
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    steps = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+    return rows, starts, ends - 1
+
+
+def invert_condition(target, lower, upper, a_values, b_values, V_0_values,
+                     xtol=1e-12 * eV, ftol=1e-9):
+    """
+    Solves f(E) = target for E inside the brackets [lower, upper].
+
+    All arguments broadcast together and give one root per element. The
+    brackets are bisected as a single array until all of them are narrower
+    than xtol (in J). Where the bracket holds no sign change the result is
+    the endpoint matching the target to within ftol, or NaN otherwise.
+    """
+    target, lower, upper, a, b, V_0 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (target, lower, upper, a_values, b_values, V_0_values)))
+    kappa = m * b * V_0 / hbar**2
+    if target.size == 0:
+        return np.empty(target.shape)
+
+    residual_lower = _condition(wave_number(lower), a, kappa) - target
+    residual_upper = _condition(wave_number(upper), a, kappa) - target
+    sign_lower = np.sign(residual_lower)
+    no_bracket = sign_lower * np.sign(residual_upper) > 0
+    edge_lower = no_bracket & (np.abs(residual_lower) <= ftol)
+    edge_upper = no_bracket & (np.abs(residual_upper) <= ftol) & ~edge_lower
+    roots_lower, roots_upper = lower[edge_lower], upper[edge_upper]
+
+    n_iter = int(np.ceil(np.log2(max(np.max(upper - lower) / xtol, 1))))
+    for _ in range(n_iter):
+        mid = 0.5 * (lower + upper)
+        same = np.sign(_condition(wave_number(mid), a, kappa) - target) == sign_lower
+        lower = np.where(same, mid, lower)
+        upper = np.where(same, upper, mid)
+
+    roots = 0.5 * (lower + upper)
+    roots[no_bracket] = np.nan
+    roots[edge_lower] = roots_lower
+    roots[edge_upper] = roots_upper
+    return roots
+
+
+def band_edges(a_values, b_values, V_0_values, E_max, E_min=0.0, n_scan=1000,
+               xtol=1e-12 * eV):
+    """
+    Allowed-band intervals of the Kronig-Penney condition, refined to xtol.
+
+    f(E) - 1 and f(E) + 1 are scanned for sign changes on a coarse grid of
+    n_scan energies per crystal; every bracket is then bisected at once
+    until it is narrower than xtol (in J). Bands cut by E_min or E_max are
+    clipped to the scan range, and bands or gaps narrower than the scan
+    spacing that do not change the sign at the grid points are not seen.
+
+    Returns (rows, intervals): the crystal index of each band and an
+    (n_bands, 2) array of (E_start, E_end) in J, sorted by crystal and
+    energy.
+    """
+    a_values, b_values, V_0_values = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(a_values, dtype=float)),
+        np.atleast_1d(np.asarray(b_values, dtype=float)),
+        np.atleast_1d(np.asarray(V_0_values, dtype=float)))
+    kappa_values = m * b_values * V_0_values / hbar**2
+
+    E = np.linspace(E_min, E_max, n_scan)
+    f = _condition(wave_number(E), a_values[:, None], kappa_values[:, None])
+
+    rows, levels, lower, upper, entering = [], [], [], [], []
+    for level in (1, -1):
+        above = f > level
+        row, cell = np.nonzero(above[:, :-1] != above[:, 1:])
+        rows.append(row)
+        levels.append(np.full(len(row), level, dtype=float))
+        lower.append(E[cell])
+        upper.append(E[cell + 1])
+        # entering a band means going from |f| > 1 to |f| <= 1
+        entering.append(above[row, cell] == (level == 1))
+    rows, levels, lower, upper, entering = map(
+        np.concatenate, (rows, levels, lower, upper, entering))
+
+    roots = invert_condition(levels, lower, upper, a_values[rows], b_values[rows],
+                             V_0_values[rows], xtol=xtol)
+
+    # Bands already open at E_min or still open at E_max are clipped there
+    inside = np.abs(f) <= 1
+    open_rows = np.nonzero(inside[:, 0])[0]
+    close_rows = np.nonzero(inside[:, -1])[0]
+    rows = np.concatenate((rows, open_rows, close_rows))
+    roots = np.concatenate((roots, np.full(len(open_rows), float(E_min)),
+                            np.full(len(close_rows), float(E_max))))
+    entering = np.concatenate((entering, np.ones(len(open_rows), dtype=bool),
+                               np.zeros(len(close_rows), dtype=bool)))
+
+    # Sorted by crystal then energy, edges alternate start / end
+    order = np.lexsort((entering, roots, rows))
+    rows, roots, entering = rows[order], roots[order], entering[order]
+    starts = np.nonzero(entering)[0]
+    intervals = np.column_stack((roots[starts], roots[starts + 1]))
+    return rows[starts], intervals
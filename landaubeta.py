@@ -8,24 +8,82 @@ Libraries required:
 - matplotlib
 - numpy
 - scipy
+
+matplotlib, numpy and scipy are imported inside the functions that use
+them, so importing this module (e.g. only to call use_latex_fonts) costs
+no more than the standard library; the style helpers load matplotlib but
+not pyplot. The names np, plt, chi2 and Text of earlier versions are
+still available as module attributes, imported on first access.
 """
 
+import contextlib
+import importlib
+import itertools
 import math
-import matplotlib.pyplot as plt
-import numpy as np
-from scipy.stats import chi2
-import pandas as pd
+import os
+import time
 
-def use_latex_fonts():
-    """Configure matplotlib to use LaTeX font rendering"""
-    plt.rcParams['text.usetex'] = True
-    plt.rcParams['font.family'] = 'serif'
+_LAZY_ATTRIBUTES = {
+    'np': ('numpy', None),
+    'plt': ('matplotlib.pyplot', None),
+    'Text': ('matplotlib.text', 'Text'),
+    'chi2': ('scipy.stats', 'chi2'),
+    'gammaln': ('scipy.special', 'gammaln'),
+}
 
-def use_IEEE_style():
-    plt.rcParams.update({
-        "text.usetex": True,
-        "font.family": "serif",
-        "font.serif": ["Times"],     # IEEE uses Times New Roman
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+TEXT_ENGINES = ('usetex', 'pgf', 'mathtext')
+text_engine = os.environ.get('LANDAUBETA_TEXT', 'usetex')
+# plot_decimated draws every point when False (LANDAUBETA_DECIMATE=0)
+decimation = os.environ.get('LANDAUBETA_DECIMATE', '1') != '0'
+# profile does nothing unless enabled here or by argument (LANDAUBETA_PROFILE=1)
+profiling = os.environ.get('LANDAUBETA_PROFILE', '0') != '0'
+
+def set_text_engine(engine):
+    """
+    Select how use_latex_fonts and use_IEEE_style typeset text:
+    'usetex' runs LaTeX for every new label, 'pgf' runs it once per saved
+    PDF (pgf backend, see save_figure) and 'mathtext' uses matplotlib's
+    own Computer Modern / STIX fonts without any LaTeX. The default comes
+    from the LANDAUBETA_TEXT environment variable.
+    """
+    global text_engine
+    if engine not in TEXT_ENGINES:
+        raise ValueError(f"Unknown text engine: {engine}")
+    text_engine = engine
+
+def text_params(serif=None):
+    """rcParams for serif text (Computer Modern unless serif is given) with the current engine"""
+    params = {"text.usetex": text_engine == 'usetex', "font.family": "serif"}
+    if serif:
+        params["font.serif"] = serif
+    if text_engine == 'pgf':
+        params.update({"pgf.texsystem": "pdflatex", "pgf.rcfonts": False})
+    elif text_engine == 'mathtext':
+        if serif and 'Times' in serif:
+            params.update({"mathtext.fontset": "stix", "font.serif": ["STIXGeneral"]})
+        else:
+            # cmr10 has no unicode minus sign
+            params.update({"mathtext.fontset": "cm", "font.serif": ["cmr10"],
+                           "axes.unicode_minus": False})
+        params["axes.formatter.use_mathtext"] = True
+    return params
+
+def latex_fonts_params():
+    return text_params()
+
+def IEEE_style_params():
+    params = text_params(["Times"])  # IEEE uses Times New Roman
+    params.update({
         "font.size": 10,             # Standard IEEE body text size
         "axes.labelsize": 10,
         "legend.fontsize": 8,        # Slightly smaller legends
@@ -34,7 +92,186 @@ def use_IEEE_style():
         "figure.figsize": (3.5, 3.5 / 1.618),
         "savefig.bbox": "tight",     # Minimizes white space around the plot
         "savefig.pad_inches": 0.05
-})
+    })
+    return params
+
+def use_latex_fonts():
+    """Configure matplotlib to use LaTeX font rendering"""
+    import matplotlib
+    matplotlib.rcParams.update(latex_fonts_params())
+
+def use_IEEE_style():
+    import matplotlib
+    matplotlib.rcParams.update(IEEE_style_params())
+
+def set_tex_cache(directory):
+    """
+    Keep matplotlib's cache of compiled TeX labels in directory/tex.cache,
+    e.g. in a directory persisted between CI runs. Labels are cached by
+    content, so a warm cache skips LaTeX entirely for labels seen before.
+
+    The location is passed through the environment: MPLCONFIGDIR for
+    matplotlib, which also keeps its font cache there, and TEXMFVAR for
+    the files TeX generates. matplotlib reads it when it is imported, so
+    this applies to this process only if matplotlib is not imported yet,
+    and to every process started (not forked) afterwards.
+    """
+    directory = os.path.abspath(directory)
+    os.makedirs(directory, exist_ok=True)
+    os.environ['MPLCONFIGDIR'] = directory
+    os.environ['TEXMFVAR'] = os.path.join(directory, 'texmf-var')
+
+def figure_labels(fig):
+    """Unique (text, fontsize) pairs of the visible text of fig, tick labels included"""
+    from matplotlib.text import Text
+    for ax in fig.axes:
+        # Fills in the tick label strings without drawing
+        ax.get_xticklabels()
+        ax.get_yticklabels()
+    labels = set()
+    for text in fig.findobj(Text):
+        if text.get_visible() and text.get_text():
+            labels.add((text.get_text(), text.get_fontsize()))
+            # Used by matplotlib for the baseline of every text size
+            labels.add(("lp", text.get_fontsize()))
+    return labels
+
+def prewarm_tex_cache(labels, workers=None):
+    """Compile (text, fontsize) labels with LaTeX in parallel threads, skipping cached ones"""
+    from concurrent.futures import ThreadPoolExecutor
+    from matplotlib.texmanager import TexManager
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda label: TexManager.make_dvi(*label), labels))
+
+def save_figure(fig, path, **kwargs):
+    """fig.savefig, through the pgf backend for PDFs when the text engine is 'pgf'"""
+    if text_engine == 'pgf' and str(path).endswith('.pdf'):
+        kwargs.setdefault('backend', 'pgf')
+    fig.savefig(path, **kwargs)
+
+def render_batch(figures, directory, rc=None, workers=None, prewarm=True):
+    """
+    Build and save many figures in one interpreter.
+
+    figures maps file names to functions returning a Figure. All figures
+    are built under the rcParams rc, their labels are collected once
+    (identical strings are compiled once), compiled in parallel with the
+    usetex engine, and then every figure is saved into directory. Returns
+    the number of unique labels and the seconds spent building,
+    prewarming and saving.
+    """
+    import matplotlib.pyplot as plt
+    timing = {'labels': 0, 'build': 0.0, 'prewarm': 0.0, 'save': 0.0}
+    os.makedirs(directory, exist_ok=True)
+    with plt.rc_context(rc or {}):
+        start = time.perf_counter()
+        built = {name: build() for name, build in figures.items()}
+        timing['build'] = time.perf_counter() - start
+
+        labels = set()
+        for fig in built.values():
+            labels |= figure_labels(fig)
+        timing['labels'] = len(labels)
+        if prewarm and plt.rcParams['text.usetex']:
+            start = time.perf_counter()
+            prewarm_tex_cache(labels, workers)
+            timing['prewarm'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name, fig in built.items():
+            save_figure(fig, os.path.join(directory, name))
+            plt.close(fig)
+        timing['save'] = time.perf_counter() - start
+    return timing
+
+def decimate(x, y, n_buckets=None):
+    """
+    Points of the line (x, y) that draw the same picture at n_buckets
+    columns across the x range: the first, last, lowest and highest point
+    of every column (M4), so peaks and band edges survive. Runs of equal
+    y are then reduced to their end points, which is lossless, so a
+    constant line keeps two points and step data keeps its edges. With
+    n_buckets None only the runs are reduced. x must be monotonic; data
+    with NaN or inf is returned unchanged.
+    """
+    import numpy as np
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= 2 or not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+        return x, y
+    n = len(y)
+    if n_buckets and n > 4 * n_buckets and x[-1] != x[0]:
+        bucket = np.minimum(((x - x[0]) * (n_buckets / (x[-1] - x[0]))).astype(np.intp), n_buckets - 1)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ends = np.r_[starts[1:], n] - 1
+        group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+        keep = [starts, ends]
+        for extreme in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+            hits = np.flatnonzero(y == extreme[group])
+            # First hit of every bucket
+            keep.append(hits[np.r_[True, group[hits[1:]] != group[hits[:-1]]]])
+        keep = np.unique(np.concatenate(keep))
+        x, y = x[keep], y[keep]
+    interior = np.r_[False, (y[1:-1] == y[:-2]) & (y[1:-1] == y[2:]), False]
+    return x[~interior], y[~interior]
+
+def plot_decimated(ax, x, y, *args, oversample=2, **kwargs):
+    """
+    ax.plot(x, y, ...) with the line decimated to oversample points per
+    pixel of the axes width (at the figure's dpi), which keeps PDFs small
+    and savefig fast without visible change. Call it once the figure has
+    its final size. Does a plain ax.plot when decimation is off.
+    """
+    if decimation:
+        n_buckets = max(1, int(ax.get_window_extent().width * oversample))
+        x, y = decimate(x, y, n_buckets)
+    return ax.plot(x, y, *args, **kwargs)
+
+@contextlib.contextmanager
+def profile(label='', enabled=None, memory=True, sort='cumulative', limit=15, path=None):
+    """
+    Opt-in profiling of a block: with profile('bands'): ... runs the block
+    under cProfile (and tracemalloc with memory) and prints its wall time,
+    the limit functions with most sort time and, with memory, the peak
+    traced memory and the lines that allocated most of what is still in
+    use. path also dumps the cProfile stats there (for snakeviz or
+    pstats). enabled defaults to the module's profiling flag, so scripts
+    can keep the wrapper in place at no cost; the flag is set from the
+    environment, and LANDAUBETA_PROFILE=1 python script.py profiles
+    every block of a script without editing it.
+    """
+    if not (profiling if enabled is None else enabled):
+        yield None
+        return
+    import cProfile
+    import pstats
+    import tracemalloc
+    tracing = memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif memory:
+        tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if tracing:
+                tracemalloc.stop()
+        print(f"--- {label or 'profile'}: {elapsed:.3f} s ---")
+        pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+        if path:
+            profiler.dump_stats(path)
+        if memory:
+            print(f"Peak traced memory: {peak / 1e6:.1f} MB; largest live allocations:")
+            for stat in snapshot.statistics('lineno')[:5]:
+                print(f"  {stat}")
 
 def format_value_error(value, error):
     """Format value with precision matching error's significant figures"""
@@ -102,50 +339,290 @@ def latex_format(value, error):
     
     return f"${result}$"
 
-def latex_table_scientific(parameter_list, formatted_list, filename):
-    # 1. Create a list of "Parameter & Value \\" strings
-    rows = [
-        f"{name} & {val} \\\\" 
-        for name, val in zip(parameter_list, formatted_list)
-    ]
+def _powers_of_ten(exponents):
+    """10**k for an integer array, with Python's rounding so results match the scalar helpers"""
+    import numpy as np
+    unique, inverse = np.unique(exponents, return_inverse=True)
+    return np.array([float(10**int(k)) for k in unique])[inverse].reshape(np.shape(exponents))
 
-    # 2. Join them with newlines
-    final_output = "\n".join(rows)
+def _format_groups(keys, template, *columns):
+    """
+    Formats row i as template(keys[i]).format(*columns[:, i]) for an
+    integer key array, with one map call per distinct key.
+    """
+    import numpy as np
+    out = np.empty(len(keys), dtype=object)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(len(unique) + 1))
+    for g, key in enumerate(unique.tolist()):
+        rows = order[bounds[g]:bounds[g + 1]]
+        out[rows] = list(map(template(key).format, *(c[rows].tolist() for c in columns)))
+    return out
 
-    # 3. Write directly to the file
-    with (filename).open('w', encoding='utf-8') as f:
-        f.write(final_output)
+def _require_finite(**arrays):
+    """Raise ValueError naming the first array holding NaN or inf"""
+    import numpy as np
+    for name, array in arrays.items():
+        bad = np.flatnonzero(~np.isfinite(array))
+        if len(bad):
+            raise ValueError(f"{name} must be finite: {len(bad)} non-finite entries, first at index {bad[0]}")
+
+def format_value_error_array(values, errors):
+    """
+    Array version of format_value_error: returns (value strings, error
+    strings) as object arrays. Exponents and decimal places are computed
+    with NumPy for whole columns and rows sharing a precision are
+    formatted together. A zero error gives the value alone and "0";
+    NaN or infinite errors raise ValueError, as they do for the scalar
+    version.
+    """
+    import numpy as np
+    values = np.asarray(values, dtype=float).ravel()
+    errors = np.asarray(errors, dtype=float).ravel()
+    _require_finite(errors=errors)
+    zero = errors == 0
+    error_exp = np.floor(np.log10(np.abs(np.where(zero, 1, errors)))).astype(int)
+    decimal_places = -error_exp
+    # Error digits before the decimal point keep error_exp + 1 decimals (as format_value_error)
+    precision = np.where(decimal_places <= 0, -decimal_places + 1, decimal_places)
+    precision[zero] = -1
+
+    value_strings = _format_groups(precision, lambda p: "{:.6g}" if p < 0 else f"{{:.{p}f}}", values)
+    error_strings = np.array(list(map("{:.1g}".format, errors.tolist())), dtype=object)
+    error_strings[zero] = "0"
+    return value_strings, error_strings
+
+def latex_format_array(values, errors):
+    """
+    Array version of latex_format: one "$v \\pm e$" string per row, as an
+    object array. Rows are grouped by (precision, exponent) so each needs
+    a single format call. A zero error gives "$value$"; NaN or infinite
+    values and errors raise ValueError.
+    """
+    import numpy as np
+    values = np.asarray(values, dtype=float).ravel()
+    errors = np.asarray(errors, dtype=float).ravel()
+    _require_finite(values=values, errors=errors)
+    zero = errors == 0
+    error_order = np.floor(np.log10(np.abs(np.where(zero, 1, errors)))).astype(int)
+    val_order = np.floor(np.log10(np.abs(np.where(values == 0, 1, values)))).astype(int)
+    scientific = (np.abs(values) >= 1000) | (np.abs(values) < 0.01)
+    exponent = np.where(scientific, val_order, 0)
+    scale = _powers_of_ten(exponent)
+    precision = np.maximum(0, exponent - error_order)
+    precision[zero] = -1
+
+    # Exponents of doubles lie within +-400
+    def template(key):
+        p, k = divmod(key, 1000)
+        p, k = p - 1, k - 500
+        if p < 0:
+            return "${}$"
+        if k == 0:
+            return f"${{:.{p}f}} \\pm {{:.{p}f}}$"
+        return f"$({{:.{p}f}} \\pm {{:.{p}f}}) \\times 10^{{{{{k}}}}}$"
+
+    keys = (precision + 1) * 1000 + np.where(zero, 0, exponent) + 500
+    v_scaled = np.where(zero, values, values / scale)
+    e_scaled = errors / scale
+    return _format_groups(keys, template, v_scaled, e_scaled)
+
+def latex_table_scientific(parameter_list, formatted_list, filename, chunk_rows=10000):
+    """
+    Write "name & value \\\\" rows to filename (str or Path), streaming
+    chunk_rows rows at a time through a buffered file instead of
+    building the whole table in memory. Inputs can be any iterables,
+    e.g. the output of latex_format_array.
+    """
+    rows = (f"{name} & {val} \\\\" for name, val in zip(parameter_list, formatted_list))
+    with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        separator = ""
+        while chunk := list(itertools.islice(rows, chunk_rows)):
+            f.write(separator)
+            f.write("\n".join(chunk))
+            separator = "\n"
 
 def print_scientific(popt, perr, names):
-    for i in range(len(popt)):
-        parameter_value, parameter_error = format_value_error(popt[i], perr[i])
-        print(f"  {names[i]}: {parameter_value} ± {parameter_error}")
+    values, errors = format_value_error_array(popt, perr)
+    print("\n".join(f"  {name}: {v} ± {e}" for name, v, e in zip(names, values, errors)))
+
+# dtype of fit_statistics, as a list so that numpy is not needed to define it
+FIT_STATISTICS = [('chi2', 'f8'), ('dof', 'i8'), ('p', 'f8'), ('log_p', 'f8'), ('reduced_chi2', 'f8')]
+
+def _log_gammaincc(a, z, max_terms=1000):
+    """
+    log of the regularised upper incomplete gamma function Q(a, z) for
+    z > a + 1, by Lentz's method on its continued fraction; finite where
+    Q itself underflows.
+    """
+    import numpy as np
+    from scipy.special import gammaln
+    tiny = 1e-300
+    b = z + 1 - a
+    c = np.full_like(b, 1 / tiny)
+    d = 1 / b
+    h = d.copy()
+    for i in range(1, max_terms):
+        an = -i * (i - a)
+        b = b + 2
+        d = an * d + b
+        d = np.where(np.abs(d) < tiny, tiny, d)
+        c = b + an / c
+        c = np.where(np.abs(c) < tiny, tiny, c)
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if np.all(np.abs(delta - 1) < 1e-15):
+            break
+    return a * np.log(z) - z - gammaln(a) + np.log(h)
+
+def fit_statistics(chi2_stat, dof):
+    """
+    Structured array (FIT_STATISTICS) of chi-squared statistics and their
+    degrees of freedom. p = chi2.sf, which stays accurate where
+    1 - chi2.cdf underflows to 0, and log_p = log(p); where even sf
+    underflows, log_p is taken from the continued fraction of the
+    incomplete gamma function. Fits without degrees of freedom get NaN.
+    """
+    import numpy as np
+    from scipy.stats import chi2
+    chi2_stat, dof = np.broadcast_arrays(np.asarray(chi2_stat, dtype=float), np.asarray(dof))
+    stats = np.empty(chi2_stat.shape, dtype=FIT_STATISTICS)
+    valid = dof > 0
+    safe_dof = np.where(valid, dof, 1)
+    stats['chi2'] = chi2_stat
+    stats['dof'] = dof
+    p = np.where(valid, chi2.sf(chi2_stat, safe_dof), np.nan)
+    with np.errstate(divide='ignore'):
+        log_p = np.log(p)
+    # chi2.logsf is log(sf) too (and slower), so compute the underflowed tail apart
+    tail = valid & (p < np.finfo(float).tiny)
+    if tail.any():
+        log_p[tail] = _log_gammaincc(safe_dof[tail] / 2, chi2_stat[tail] / 2)
+    stats['p'] = p
+    stats['log_p'] = log_p
+    stats['reduced_chi2'] = np.where(valid, chi2_stat / safe_dof, np.nan)
+    return stats
 
 def calculate_p_value_chi(x, y, model_func, popt, y_err=None, print_parameters=False):
     """
     Calculates the chi-squared statistic and p-value for a given fit.
     """
+    import numpy as np
+    from scipy.stats import chi2
     # Calculate residuals
     residuals = y - model_func(x, *popt)
-    
+
     # Use provided errors, otherwise estimate from residuals
     if y_err is None:
         y_err = np.ones_like(y) * np.std(residuals)
-    
+
     # Chi-squared statistic
     chi2_stat = np.sum((residuals / y_err)**2)
-    
+
     # Degrees of freedom
     dof = len(y) - len(popt)
-    
-    # P-value
-    p_value = 1.0 - chi2.cdf(chi2_stat, dof)
-    
+
+    # P-value (survival function: no cancellation for large chi-squared)
+    p_value = chi2.sf(chi2_stat, dof)
+
     if print_parameters:
         print(f"\nEmpirical fit statistics:")
         print(f"Chi-squared statistic: {chi2_stat:.4f}")
         print(f"Degrees of freedom: {dof}")
-        print(f"p-value: {p_value:.120f}")
+        print(f"p-value: {p_value:.6e} (ln p = {fit_statistics(chi2_stat, dof)['log_p']:.4f})")
         print(f"Reduced chi-squared (χ²/dof): {chi2_stat / dof:.4f}")
 
-    return p_value, chi2_stat, dof
\ No newline at end of file
+    return p_value, chi2_stat, dof
+
+def _as_rows(data, fill=0.0):
+    """
+    2D float array (rows, points) and mask (True = missing) from an array,
+    a masked array or a list of 1D arrays of different lengths, which are
+    padded with their last value (fill if empty).
+    """
+    import numpy as np
+    if isinstance(data, (list, tuple)) and len(data) and np.ndim(data[0]) == 1:
+        width = max(len(row) for row in data)
+        rows = np.full((len(data), width), fill, dtype=float)
+        mask = np.ones((len(data), width), dtype=bool)
+        for i, row in enumerate(data):
+            rows[i, :len(row)] = row
+            rows[i, len(row):] = row[-1] if len(row) else fill
+            mask[i, :len(row)] = False
+        return rows, mask
+    mask = np.ma.getmaskarray(data)
+    rows = np.ma.getdata(data).astype(float)
+    return np.atleast_2d(rows), np.atleast_2d(mask)
+
+def calculate_p_value_chi_batch(x, y, model_func, popts, y_err=None, mask=None,
+                                chunk_size=2**16):
+    """
+    Goodness of fit of many fits in one broadcast call, as a structured
+    array (FIT_STATISTICS) with one entry per fit.
+
+    popts has shape (n_fits, n_params), or (n_params,) for one parameter
+    vector. model_func(x, *params) is called with every parameter of
+    shape (n_fits, 1), so it must broadcast like a NumPy expression. x, y
+    and y_err are either one dataset of shape (n_points,), shared by
+    every fit, or one dataset per fit: arrays of shape (n_fits, n_points),
+    masked arrays, or lists of arrays of different lengths. mask (True =
+    point excluded) is combined with the masks of the inputs, and the
+    degrees of freedom are the number of points used minus n_params.
+    Without y_err the error of every fit is the standard deviation of its
+    residuals, as in calculate_p_value_chi. Every input has one row or
+    n_fits rows, otherwise ValueError is raised before anything is
+    evaluated. Fits are evaluated chunk_size at a time to bound memory.
+    """
+    import numpy as np
+    popts = np.atleast_2d(np.asarray(popts, dtype=float))
+    x, x_mask = _as_rows(x)
+    y, y_mask = _as_rows(y)
+    inputs = {'popts': popts, 'x': x, 'y': y}
+    if y_err is not None:
+        y_err, err_mask = _as_rows(y_err, fill=1.0)
+        inputs['y_err'] = y_err
+    if mask is not None:
+        mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+        inputs['mask'] = mask
+    # Several parameter sets fix the number of fits; the data must match them
+    n_fits = len(popts) if len(popts) > 1 else max(len(rows) for rows in inputs.values())
+    for name, rows in inputs.items():
+        if len(rows) not in (1, n_fits):
+            raise ValueError(f"{name} has {len(rows)} rows, expected 1 or {n_fits}")
+    missing = x_mask | y_mask
+    if y_err is not None:
+        missing = missing | err_mask
+    if mask is not None:
+        missing = missing | mask
+    used = ~missing
+
+    def chunk(rows, start, stop):
+        return rows if len(rows) == 1 else rows[start:stop]
+
+    masked = not used.all()
+    n_used = used.sum(axis=1)
+    chi2_stat = np.empty(n_fits)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, n_fits, chunk_size):
+            stop = min(start + chunk_size, n_fits)
+            params = chunk(popts, start, stop)
+            model = model_func(chunk(x, start, stop), *(p[:, None] for p in params.T))
+            residuals = chunk(y, start, stop) - model
+            if masked:
+                weights = chunk(used, start, stop)
+                residuals = np.where(weights, residuals, 0.0)
+            if y_err is None:
+                n = chunk(n_used, start, stop)[:, None]
+                centred = residuals - residuals.sum(axis=1, keepdims=True) / n
+                if masked:
+                    centred = np.where(weights, centred, 0.0)
+                variance = np.einsum('ij,ij->i', centred, centred)[:, None] / n
+                residuals = residuals / np.sqrt(variance)
+            else:
+                residuals = residuals / chunk(y_err, start, stop)
+                if masked:
+                    residuals = np.where(weights, residuals, 0.0)
+            chi2_stat[start:stop] = np.einsum('ij,ij->i', residuals, residuals)
+    return fit_statistics(chi2_stat, np.broadcast_to(n_used, n_fits) - popts.shape[1])
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Build graph of the essay figures in latex/.
+
+Every figure included by latex/main.tex is declared in FIGURES as a scene
+of scenes.py, its parameters (the scene defaults or a crystal set of
+scenes.py, which the script reads too), a landaubeta style and the files
+it comes from (the script that draws it and the modules it computes with).
+A target's digest hashes the source of the scene's compute and render
+functions and of the scenes.py functions they call, the files of every
+module of this project they use (landaubeta, diffraction, ...), the
+target's files, the parameters with the scene's defaults filled in, the
+style, the text engine, line decimation and the matplotlib version;
+digests of built outputs are kept in .figures.json next to them. build renders only the
+targets whose output is missing or whose digest changed, spread over a
+process pool, and each process renders its figures in one batch with
+landaubeta.render_batch (labels compiled once).
+
+Usage:
+    python latex_figures.py                        # stale figures, usetex, into latex/
+    python latex_figures.py --force                # every figure
+    python latex_figures.py --engine mathtext      # no LaTeX needed
+    python latex_figures.py --tex-cache .texcache  # persistent TeX cache
+    python latex_figures.py --list                 # show which figures are stale
+    python latex_figures.py --check                # one figure with every text engine
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import time
+import matplotlib
+matplotlib.use('Agg')
+
+import landaubeta
+import scenes
+
+Target = namedtuple('Target', ['scene', 'params', 'style', 'sources'])
+
+FIGURES = {
+    'diffraction.pdf': Target('double_slit', {}, 'latex', ['2d_wave.py', 'wave_field.py']),
+    'two_slit_pattern.pdf': Target('interference_pattern', {}, 'latex',
+                                   ['interference_pattern.py', 'diffraction.py']),
+    'two_slit_hist.pdf': Target('interference_histogram', {}, 'latex',
+                                ['interference_histogram.py', 'diffraction.py', 'sampling.py',
+                                 'buildup.py']),
+    'potential_barrier.pdf': Target('potential_barrier', {}, 'latex', ['tunneling.py']),
+    'kp_potential.pdf': Target('kp_diagram', {}, 'latex', ['kp-potential_2.py', 'lattice_potential.py']),
+    'bands_copper.pdf': Target('kp_condition', scenes.CRYSTALS['copper'], 'latex',
+                               ['plot_figures.py', 'kp_bands.py']),
+    'bands_silicon.pdf': Target('kp_condition', scenes.CRYSTALS['silicon'], 'latex',
+                                ['plot_figures.py', 'kp_bands.py']),
+    'bands_nacl.pdf': Target('kp_condition', scenes.CRYSTALS['nacl'], 'latex',
+                             ['plot_figures.py', 'kp_bands.py']),
+    'bands_silicon_wide.pdf': Target('kp_condition', scenes.WIDE_CRYSTALS['silicon'], 'latex',
+                                     ['plot_figures copy.py', 'kp_bands.py']),
+}
+
+STAMP_FILE = '.figures.json'
+
+# Programs a text engine needs; check_engines skips engines missing one
+ENGINE_TOOLS = {'usetex': ['latex', 'dvipng'], 'pgf': ['pdflatex'], 'mathtext': []}
+
+STYLES = {
+    'latex': landaubeta.latex_fonts_params,
+    'ieee': landaubeta.IEEE_style_params,
+}
+
+
+def figure_builder(scene_name, params):
+    scene = scenes.SCENES[scene_name]
+    return lambda: scene.render(scene.compute(params), params)
+
+
+def render_figures(names=None, directory='latex', workers=None):
+    """
+    Renders the named entries of FIGURES (all by default) into directory
+    with the current landaubeta text engine. Returns the render_batch
+    timings summed over the styles.
+    """
+    names = list(names or FIGURES)
+    total = {'labels': 0, 'build': 0.0, 'prewarm': 0.0, 'save': 0.0}
+    for style, style_params in STYLES.items():
+        figures = {name: figure_builder(FIGURES[name].scene, FIGURES[name].params)
+                   for name in names if FIGURES[name].style == style}
+        if figures:
+            timing = landaubeta.render_batch(figures, directory, style_params(), workers)
+            for key in total:
+                total[key] += timing[key]
+    return total
+
+
+def scene_dependencies(scene):
+    """
+    Functions of scenes.py that the scene's compute and render steps run
+    (themselves included) and the files of the modules of this project
+    they refer to or import, followed through the names in their code.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    functions, files = {}, set()
+    pending = [scene.compute, scene.render]
+    while pending:
+        func = inspect.unwrap(pending.pop())
+        if func.__qualname__ in functions:
+            continue
+        functions[func.__qualname__] = func
+        codes, names = [func.__code__], set()
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for name in names:
+            value = func.__globals__.get(name)
+            if (callable(value) and getattr(value, '__module__', None) == scenes.__name__
+                    and inspect.isfunction(inspect.unwrap(value))):
+                pending.append(value)
+                continue
+            module = value if inspect.ismodule(value) else inspect.getmodule(value)
+            path = getattr(module, '__file__', None)
+            if value is None:
+                # Not a global: a module imported inside the function
+                path = os.path.join(here, f'{name}.py')
+                if not os.path.isfile(path):
+                    continue
+            if path and os.path.dirname(os.path.abspath(path)) == here:
+                files.add(os.path.abspath(path))
+    return functions, files
+
+
+def target_digest(name):
+    """Hash of everything the output of FIGURES[name] depends on"""
+    target = FIGURES[name]
+    scene = scenes.SCENES[target.scene]
+    functions, files = scene_dependencies(scene)
+    hasher = hashlib.sha256()
+    for qualname in sorted(functions):
+        hasher.update(inspect.getsource(functions[qualname]).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    files.discard(os.path.abspath(scenes.__file__))
+    for path in sorted(files | {os.path.join(here, source) for source in target.sources}):
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+    params = scenes.with_defaults(scene.defaults, target.params)
+    settings = [params, STYLES[target.style](), landaubeta.text_engine, landaubeta.decimation,
+                matplotlib.__version__]
+    hasher.update(json.dumps(settings, sort_keys=True, default=repr).encode())
+    return hasher.hexdigest()
+
+
+def read_stamps(directory):
+    try:
+        with open(os.path.join(directory, STAMP_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def stale_targets(names=None, directory='latex'):
+    """Names whose output is missing or was built from different inputs, with their digests"""
+    stamps = read_stamps(directory)
+    digests = {name: target_digest(name) for name in (names or FIGURES)}
+    return {name: digest for name, digest in digests.items()
+            if stamps.get(name) != digest or not os.path.exists(os.path.join(directory, name))}
+
+
+def _init_worker(engine):
+    landaubeta.set_text_engine(engine)
+
+
+def build(names=None, directory='latex', force=False, n_workers=None, tex_cache=None,
+          label_workers=None):
+    """
+    Renders the stale targets among names (all of FIGURES by default),
+    or all of them with force, over n_workers processes. The stamp file
+    is updated as each process finishes. With tex_cache the processes are
+    spawned, so they import matplotlib with the cache location of
+    landaubeta.set_tex_cache in their environment. Returns the names
+    rebuilt.
+    """
+    names = list(names or FIGURES)
+    todo = {name: target_digest(name) for name in names} if force else stale_targets(names, directory)
+    if not todo:
+        return []
+    os.makedirs(directory, exist_ok=True)
+    n_workers = min(n_workers or os.cpu_count() or 1, len(todo))
+    # Round-robin so every process gets a mix of styles and scenes
+    groups = [list(todo)[i::n_workers] for i in range(n_workers)]
+    stamps = read_stamps(directory)
+    context = None
+    if tex_cache:
+        landaubeta.set_tex_cache(tex_cache)
+        context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(n_workers, mp_context=context, initializer=_init_worker,
+                             initargs=(landaubeta.text_engine,)) as pool:
+        jobs = {pool.submit(render_figures, group, directory, label_workers): group
+                for group in groups}
+        for job in as_completed(jobs):
+            job.result()
+            stamps.update({name: todo[name] for name in jobs[job]})
+            with open(os.path.join(directory, STAMP_FILE), 'w', encoding='utf-8') as f:
+                json.dump(stamps, f, indent=1, sort_keys=True)
+    return list(todo)
+
+
+def check_engines(name='potential_barrier.pdf', engines=landaubeta.TEXT_ENGINES):
+    """
+    Smoke test of the text engines: renders FIGURES[name] once with each
+    engine, in its own process, into a temporary directory. Returns
+    {engine: 'ok', 'skipped (no <program>)' or the error raised}.
+    """
+    import shutil
+    import tempfile
+    status = {}
+    for engine in engines:
+        missing = [tool for tool in ENGINE_TOOLS[engine] if not shutil.which(tool)]
+        if missing:
+            status[engine] = f"skipped (no {', '.join(missing)})"
+            continue
+        with tempfile.TemporaryDirectory() as tmp, \
+                ProcessPoolExecutor(1, initializer=_init_worker, initargs=(engine,)) as pool:
+            try:
+                pool.submit(render_figures, [name], tmp).result()
+                ok = os.path.getsize(os.path.join(tmp, name)) > 0
+                status[engine] = 'ok' if ok else 'empty output'
+            except Exception as error:
+                status[engine] = f"{type(error).__name__}: {error}"
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the essay figures whose inputs changed")
+    parser.add_argument('names', nargs='*', help="output files to consider (default: all)")
+    parser.add_argument('--out', default='latex')
+    parser.add_argument('--engine', choices=landaubeta.TEXT_ENGINES, default=landaubeta.text_engine)
+    parser.add_argument('--tex-cache', help="directory for matplotlib's TeX cache")
+    parser.add_argument('--force', action='store_true', help="rebuild up-to-date figures too")
+    parser.add_argument('--jobs', type=int, help="number of processes")
+    parser.add_argument('--workers', type=int, help="threads compiling labels in each process")
+    parser.add_argument('--list', action='store_true', help="only list the stale figures")
+    parser.add_argument('--check', action='store_true', help="render one figure with every text engine")
+    args = parser.parse_args()
+
+    landaubeta.set_text_engine(args.engine)
+    if args.check:
+        status = check_engines()
+        for engine, result in status.items():
+            print(f"{engine:>8}  {result}")
+        if any(result != 'ok' and not result.startswith('skipped') for result in status.values()):
+            raise SystemExit(1)
+    elif args.list:
+        stale = stale_targets(args.names, args.out)
+        for name in args.names or FIGURES:
+            print(f"{'stale' if name in stale else 'ok':>6}  {name}")
+    else:
+        start = time.perf_counter()
+        rebuilt = build(args.names, args.out, args.force, args.jobs, args.tex_cache, args.workers)
+        print(f"{len(rebuilt)} of {len(args.names or FIGURES)} figures rebuilt with {args.engine} "
+              f"in {time.perf_counter() - start:.2f} s" + (f": {', '.join(rebuilt)}" if rebuilt else ""))
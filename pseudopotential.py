@@ -0,0 +1,246 @@
+"""
+Band structures of cubic crystals with the empirical pseudopotential method.
+
+The wavefunction at crystal momentum k is expanded in plane waves k + G
+over the reciprocal lattice vectors with |G|^2 <= g2_max (in units of
+(2 pi / a)^2), and the Hamiltonian is
+
+    H[G, G'] = |k + G|^2 delta(G, G') + V(G - G')
+
+in Rydberg, with lengths in bohr. V(G) = (1/n) sum_j v_j(|G|^2) exp(-i G.tau_j)
+is the sum of the form factors v_j of the n atoms of the basis times their
+structure factors, so V only depends on G - G' and the whole potential
+matrix is built once per crystal; each k adds the kinetic diagonal only.
+
+Only the lowest n_bands eigenvalues are computed: by LAPACK's partial
+eigensolver (solver='eigh') or by LOBPCG warm-started from the
+eigenvectors of the previous k-point of the path (solver='lobpcg'), which
+is about 10 times faster with ~2000 plane waves; 'auto' picks by size.
+band_structure splits a k-path into contiguous pieces over a process
+pool, each process building the Hamiltonian once.
+
+Form factors are those of Cohen and Bergstresser, Phys. Rev. 141, 789
+(1966), for the diamond (Si, Ge) and zincblende (GaAs) crystals; fcc and
+rocksalt lattices take the form factors of their atoms as arguments, and
+empty form factors give the free-electron (empty lattice) bands.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+import warnings
+import numpy as np
+import scipy.linalg
+from scipy.sparse.linalg import LinearOperator, lobpcg
+
+Ry = 13.605693122994    # eV
+bohr = 0.529177210903   # Angstrom
+# Plane-wave count above which solver='auto' uses LOBPCG instead of dense eigh
+LOBPCG_MIN_SIZE = 400
+
+Crystal = namedtuple('Crystal', ['name', 'a', 'positions', 'form_factors', 'valence_bands'])
+Crystal.__doc__ = """
+a in Angstrom; positions of the basis atoms in units of a; one dict
+{|G|^2 in (2 pi / a)^2: form factor in Ry} per atom; valence_bands is the
+number of filled bands (0 if not meaningful), used to set the energy zero.
+"""
+
+
+def fcc(name, a, form_factor=None, valence_bands=0):
+    """One atom per fcc lattice point (e.g. Cu)"""
+    return Crystal(name, a, np.zeros((1, 3)), [form_factor or {}], valence_bands)
+
+
+def diamond(name, a, symmetric, valence_bands=4):
+    """Two identical atoms at -+(1, 1, 1) a / 8; symmetric = {|G|^2: V_S}"""
+    tau = np.full(3, 1 / 8)
+    return Crystal(name, a, np.array([-tau, tau]), [symmetric, symmetric], valence_bands)
+
+
+def zincblende(name, a, symmetric, antisymmetric, valence_bands=4):
+    """
+    Two atoms at -+(1, 1, 1) a / 8 with V(G) = V_S cos(G.tau) + i V_A sin(G.tau)
+    as in Cohen and Bergstresser.
+    """
+    tau = np.full(3, 1 / 8)
+    g2s = set(symmetric) | set(antisymmetric)
+    first = {g2: symmetric.get(g2, 0.0) + antisymmetric.get(g2, 0.0) for g2 in g2s}
+    second = {g2: symmetric.get(g2, 0.0) - antisymmetric.get(g2, 0.0) for g2 in g2s}
+    return Crystal(name, a, np.array([-tau, tau]), [first, second], valence_bands)
+
+
+def rocksalt(name, a, cation, anion, valence_bands=0):
+    """Cation at the origin and anion at (1/2, 0, 0) a (e.g. NaCl)"""
+    return Crystal(name, a, np.array([[0, 0, 0], [0.5, 0, 0]]), [cation, anion], valence_bands)
+
+
+CRYSTALS = {
+    'Si': diamond('Si', 5.43, {3: -0.21, 8: 0.04, 11: 0.08}),
+    'Ge': diamond('Ge', 5.66, {3: -0.23, 8: 0.01, 11: 0.06}),
+    'GaAs': zincblende('GaAs', 5.64, {3: -0.23, 8: 0.01, 11: 0.06}, {3: 0.07, 4: 0.05, 11: 0.01}),
+}
+
+# High-symmetry points of the fcc Brillouin zone in units of 2 pi / a
+SYMMETRY_POINTS = {
+    'G': (0, 0, 0), 'X': (1, 0, 0), 'L': (0.5, 0.5, 0.5), 'W': (1, 0.5, 0),
+    'K': (0.75, 0.75, 0), 'U': (1, 0.25, 0.25),
+}
+
+
+def reciprocal_vectors(g2_max):
+    """Vectors G of the fcc reciprocal lattice with |G|^2 <= g2_max, in units of 2 pi / a, by |G|"""
+    n = int(np.ceil(np.sqrt(g2_max))) + 1
+    b = np.array([[-1, 1, 1], [1, -1, 1], [1, 1, -1]])
+    m = np.arange(-n, n + 1)
+    coefficients = np.stack(np.meshgrid(m, m, m, indexing='ij'), axis=-1).reshape(-1, 3)
+    G = coefficients @ b
+    G = G[np.sum(G**2, axis=1) <= g2_max]
+    return G[np.lexsort((G[:, 2], G[:, 1], G[:, 0], np.sum(G**2, axis=1)))]
+
+
+def fcc_path(path='L-G-X-U|K-G', n_points=200):
+    """
+    k-points along path (segments joined by '-', jumps between equivalent
+    points by '|'), spaced evenly in |k| with n_points in total. Returns
+    (k (n, 3) in units of 2 pi / a, distance along the path, tick
+    positions, tick labels).
+    """
+    pieces = [piece.split('-') for piece in path.split('|')]
+    segments = [(np.array(SYMMETRY_POINTS[a], dtype=float), np.array(SYMMETRY_POINTS[b], dtype=float))
+                for piece in pieces for a, b in zip(piece, piece[1:])]
+    lengths = np.array([np.linalg.norm(end - start) for start, end in segments])
+    counts = np.maximum(2, np.round(n_points * lengths / lengths.sum()).astype(int))
+    k, distance, ticks, labels = [], [], [0.0], []
+    offset = 0.0
+    for (start, end), length, count in zip(segments, lengths, counts):
+        t = np.linspace(0, 1, count)
+        k.append(start + t[:, None] * (end - start))
+        distance.append(offset + t * length)
+        offset += length
+        ticks.append(offset)
+    for piece in pieces:
+        labels.append(piece[0] if not labels else labels.pop() + '|' + piece[0])
+        labels.extend(piece[1:])
+    return np.concatenate(k), np.concatenate(distance), np.array(ticks), labels
+
+
+class BandSolver:
+    """Plane-wave basis and potential matrix of one crystal, reused for every k"""
+
+    def __init__(self, crystal, g2_max=21):
+        self.crystal = crystal
+        self.G = reciprocal_vectors(g2_max)
+        # Kinetic energy |k + G|^2 (2 pi / a)^2 in Ry, with a in bohr
+        self.scale = (2 * np.pi * bohr / crystal.a)**2
+        dG = self.G[:, None, :] - self.G[None, :, :]
+        dG2 = np.sum(dG**2, axis=-1)
+        V = np.zeros(dG2.shape, dtype=complex)
+        for position, form_factor in zip(crystal.positions, crystal.form_factors):
+            if not form_factor:
+                continue
+            v = np.zeros(dG2.max() + 1)
+            for g2, value in form_factor.items():
+                if g2 < len(v):
+                    v[g2] = value
+            V += v[dG2] * np.exp(-2j * np.pi * (dG @ position))
+        V /= len(crystal.positions)
+        # Crystals with an inversion centre have a real potential matrix
+        self.V = V.real.copy() if np.allclose(V.imag, 0) else V
+        self._previous = None
+
+    @property
+    def n_plane_waves(self):
+        return len(self.G)
+
+    def kinetic(self, k):
+        return self.scale * np.sum((np.asarray(k) + self.G)**2, axis=1)
+
+    def hamiltonian(self, k):
+        H = self.V.copy()
+        H[np.diag_indices_from(H)] += self.kinetic(k)
+        return H
+
+    def solve(self, k, n_bands=8, solver='auto', extra_bands=4, tol=1e-4, max_iter=40):
+        """
+        Lowest n_bands energies in eV at one k (units of 2 pi / a). solver
+        'auto' is 'eigh' up to LOBPCG_MIN_SIZE plane waves and 'lobpcg'
+        above. LOBPCG iterates n_bands + extra_bands vectors until the
+        residual norms are below tol (Ry; the energy error is of order
+        tol^2) and falls back to eigh when it does not get there.
+        """
+        if solver == 'auto':
+            solver = 'lobpcg' if self.n_plane_waves > LOBPCG_MIN_SIZE else 'eigh'
+        if solver not in ('eigh', 'lobpcg'):
+            raise ValueError(f"Unknown eigensolver: {solver}")
+        H = self.hamiltonian(k)
+        if solver == 'eigh':
+            return self._eigh(H, n_bands)
+
+        size = n_bands + extra_bands
+        if self._previous is None or self._previous.shape[1] != size:
+            # Start from the plane waves of lowest kinetic energy
+            X = np.zeros((len(H), size), dtype=H.dtype)
+            X[np.argsort(self.kinetic(k))[:size], np.arange(size)] = 1
+        else:
+            X = self._previous
+        # Kinetic-energy preconditioner, floored to keep it bounded near k + G = 0
+        diagonal = np.maximum(self.kinetic(k), self.scale)
+        M = LinearOperator(H.shape, matvec=lambda x: x / diagonal.reshape((-1,) + (1,) * (x.ndim - 1)),
+                           dtype=H.dtype)
+        with warnings.catch_warnings():
+            # Non-convergence is detected below from the residuals
+            warnings.simplefilter('ignore', UserWarning)
+            energies, vectors = lobpcg(H, X, M=M, largest=False, tol=tol, maxiter=max_iter)
+        order = np.argsort(energies)
+        energies, vectors = energies[order], vectors[:, order]
+        residuals = np.linalg.norm(H @ vectors[:, :n_bands] - vectors[:, :n_bands] * energies[:n_bands],
+                                   axis=0)
+        if not np.all(residuals < tol):
+            self._previous = None
+            return self._eigh(H, n_bands)
+        self._previous = vectors
+        return energies[:n_bands] * Ry
+
+    @staticmethod
+    def _eigh(H, n_bands):
+        energies = scipy.linalg.eigh(H, eigvals_only=True, subset_by_index=[0, n_bands - 1],
+                                     overwrite_a=True, check_finite=False)
+        return energies * Ry
+
+    def bands(self, k_points, n_bands=8, solver='auto'):
+        """(len(k_points), n_bands) energies in eV, in path order (warm starts follow it)"""
+        self._previous = None
+        return np.array([self.solve(k, n_bands, solver) for k in k_points])
+
+
+_worker_solver = None
+
+
+def _init_worker(crystal, g2_max):
+    global _worker_solver
+    _worker_solver = BandSolver(crystal, g2_max)
+
+
+def _worker_bands(k_points, n_bands, solver):
+    return _worker_solver.bands(k_points, n_bands, solver)
+
+
+def band_structure(crystal, k_points, n_bands=8, g2_max=21, solver='auto', n_workers=None):
+    """
+    Lowest n_bands energies in eV of crystal (a Crystal or a key of
+    CRYSTALS) at k_points (units of 2 pi / a), as a (n_k, n_bands) array.
+
+    The path is cut into n_workers contiguous pieces (os.cpu_count() by
+    default), each solved in its own process, which builds the plane-wave
+    basis and potential once; with n_workers=1 everything runs here.
+    """
+    if isinstance(crystal, str):
+        crystal = CRYSTALS[crystal]
+    k_points = np.asarray(k_points, dtype=float)
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(k_points)))
+    if n_workers == 1:
+        return BandSolver(crystal, g2_max).bands(k_points, n_bands, solver)
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(crystal, g2_max)) as pool:
+        jobs = [pool.submit(_worker_bands, piece, n_bands, solver)
+                for piece in np.array_split(k_points, n_workers)]
+        return np.concatenate([job.result() for job in jobs])
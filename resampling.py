@@ -0,0 +1,155 @@
+"""
+Bootstrap and Monte Carlo uncertainties of curve_fit parameters.
+
+resample_fit fits the data once, then refits n_resamples synthetic data
+sets: resamples of the points with replacement ('bootstrap') or the
+nominal model plus Gaussian noise of size y_err ('monte_carlo'). Every
+refit starts from the nominal popt. The refitted parameters are not
+stored: they stream into running mean/covariance accumulators (Welford's
+update, merged between chunks and processes with Chan's formula) and a
+fixed-size reservoir sample for the percentiles, so memory does not grow
+with n_resamples.
+
+The refits are split between processes like buildup.buildup: worker w
+takes n // n_workers refits, plus one if w < n % n_workers, and draws
+from stream w of SeedSequence(seed).spawn(n_workers). A seed and a
+number of workers therefore fix the result.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+from scipy.optimize import curve_fit
+
+FitResampling = namedtuple('FitResampling', ['popt', 'perr', 'mean', 'cov', 'q', 'percentiles',
+                                             'n_fits', 'n_failed'])
+FitResampling.__doc__ = """
+Result of resample_fit. popt is the nominal fit and perr the standard
+deviations of the refits, so print_scientific(r.popt, r.perr, names) and
+latex_format_array(r.popt, r.perr) work directly. percentiles has one row
+per level in q.
+"""
+
+
+class RunningMoments:
+    """Running mean and covariance of rows of samples (Welford / Chan)"""
+
+    def __init__(self, n_params):
+        self.count = 0
+        self.mean = np.zeros(n_params)
+        self.m2 = np.zeros((n_params, n_params))
+
+    def merge(self, count, mean, m2):
+        """Adds count samples with the given mean and sum of outer products of deviations"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + np.outer(delta, delta) * (self.count * count / total)
+        self.count = total
+
+    def update(self, samples):
+        """Adds the rows of samples"""
+        samples = np.atleast_2d(samples)
+        if len(samples):
+            mean = samples.mean(axis=0)
+            deviations = samples - mean
+            self.merge(len(samples), mean, deviations.T @ deviations)
+
+    def covariance(self, ddof=1):
+        return self.m2 / (self.count - ddof) if self.count > ddof else np.full_like(self.m2, np.nan)
+
+
+def _synthetic_data(method, rng, x, y, y_err, y_model, noise):
+    if method == 'bootstrap':
+        index = rng.integers(0, len(y), len(y))
+        return x[..., index], y[index], None if y_err is None else y_err[index]
+    return x, y_model + rng.normal(0.0, 1.0, len(y)) * noise, y_err
+
+
+def _worker_refits(x, y, model_func, popt, y_err, method, n_fits, seed, reservoir, buffer_size,
+                   fit_kwargs):
+    # The reservoir has its own stream, so its size does not change the refits
+    rng, reservoir_rng = (np.random.default_rng(s) for s in seed.spawn(2))
+    moments = RunningMoments(len(popt))
+    kept = np.empty((min(n_fits, reservoir), len(popt)))
+    buffer = np.empty((buffer_size, len(popt)))
+    y_model = model_func(x, *popt)
+    noise = y_err if y_err is not None else np.std(y - y_model)
+    n_done = n_failed = filled = 0
+    for _ in range(n_fits):
+        x_i, y_i, err_i = _synthetic_data(method, rng, x, y, y_err, y_model, noise)
+        try:
+            p, _ = curve_fit(model_func, x_i, y_i, p0=popt, sigma=err_i, **fit_kwargs)
+        except (RuntimeError, ValueError):
+            n_failed += 1
+            continue
+        if not np.all(np.isfinite(p)):
+            n_failed += 1
+            continue
+        # Reservoir sampling (algorithm R) of the refits for the percentiles
+        if n_done < len(kept):
+            kept[n_done] = p
+        else:
+            slot = reservoir_rng.integers(0, n_done + 1)
+            if slot < len(kept):
+                kept[slot] = p
+        n_done += 1
+        buffer[filled] = p
+        filled += 1
+        if filled == buffer_size:
+            moments.update(buffer)
+            filled = 0
+    moments.update(buffer[:filled])
+    return moments.count, moments.mean, moments.m2, kept[:min(n_done, len(kept))], n_failed
+
+
+def resample_fit(x, y, model_func, p0, y_err=None, n_resamples=1000, method='bootstrap',
+                 q=(2.5, 16, 50, 84, 97.5), seed=None, n_workers=None, reservoir=10000,
+                 buffer_size=256, **fit_kwargs):
+    """
+    Fits model_func to (x, y) with curve_fit from p0, then refits
+    n_resamples bootstrap or Monte Carlo data sets (method 'bootstrap' or
+    'monte_carlo') starting from the nominal popt. Returns a FitResampling.
+
+    y_err is passed to curve_fit as sigma and is the noise of the Monte
+    Carlo data sets (the standard deviation of the nominal residuals if
+    None). Extra keyword arguments go to every curve_fit call. The refits
+    run in n_workers processes (os.cpu_count() by default, in this process
+    if 1), so model_func must then be picklable (defined at module level).
+    Percentiles are exact up to reservoir refits per worker and estimated
+    from a uniform sample of that many refits beyond. Refits that fail to
+    converge or give non-finite parameters are counted in n_failed.
+    """
+    if method not in ('bootstrap', 'monte_carlo'):
+        raise ValueError(f"Unknown resampling method: {method}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y_err is not None:
+        y_err = np.broadcast_to(np.asarray(y_err, dtype=float), y.shape).copy()
+    popt, _ = curve_fit(model_func, x, y, p0=p0, sigma=y_err, **fit_kwargs)
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_resamples))
+    shares = [n_resamples // n_workers + (w < n_resamples % n_workers) for w in range(n_workers)]
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    args = [(x, y, model_func, popt, y_err, method, share, worker_seed, reservoir, buffer_size,
+             fit_kwargs) for share, worker_seed in zip(shares, seeds)]
+    if n_workers == 1:
+        results = [_worker_refits(*args[0])]
+    else:
+        with ProcessPoolExecutor(n_workers) as pool:
+            results = [job.result() for job in [pool.submit(_worker_refits, *a) for a in args]]
+
+    moments = RunningMoments(len(popt))
+    n_failed = 0
+    for count, mean, m2, _, failed in results:
+        moments.merge(count, mean, m2)
+        n_failed += failed
+    kept = np.concatenate([result[3] for result in results])
+    cov = moments.covariance()
+    percentiles = (np.percentile(kept, q, axis=0) if len(kept)
+                   else np.full((len(q), len(popt)), np.nan))
+    return FitResampling(popt, np.sqrt(np.diag(cov)), moments.mean, cov, np.asarray(q, dtype=float),
+                         percentiles, moments.count, n_failed)
@@ -0,0 +1,154 @@
+"""
+Random detections drawn from a probability density sampled on a grid.
+
+interference_histogram.py drew detections with np.random.choice, which
+rebuilds the CDF on every call and only returns grid points. GridSampler
+builds its tables once, treats the density as piecewise linear between
+the grid points and inverts the CDF exactly inside each cell, so
+positions are continuous. The cell is picked from the cumulative masses
+('cdf', a guide table of equal-probability buckets with a binary search
+only for the draws whose bucket spans a cell boundary) or in O(1) from a
+Walker/Vose alias table ('alias').
+
+Randomness comes from numpy.random.Generator. Large draws are produced in
+fixed-size chunks so memory stays bounded, and sample_parallel fills one
+array from several threads, each with its own stream spawned from a
+single SeedSequence, so results are reproducible for a given seed and
+thread count.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
+
+
+def alias_table(weights):
+    """
+    Vose alias table (probability, alias) for the discrete distribution
+    proportional to weights. Cell i is kept with probability probability[i]
+    and replaced by alias[i] otherwise.
+    """
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    scaled = weights * (n / weights.sum())
+    probability = np.ones(n)
+    alias = np.arange(n)
+    small = list(np.nonzero(scaled < 1)[0])
+    large = list(np.nonzero(scaled >= 1)[0])
+    while small and large:
+        s, l = small.pop(), large.pop()
+        probability[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1 - scaled[s]
+        (small if scaled[l] < 1 else large).append(l)
+    return probability, alias
+
+
+class GridSampler:
+    """
+    Sampler for the density pdf on the sorted grid x, linear between points.
+
+    pdf need not be normalised. method is 'cdf' or 'alias'; both return
+    the same distribution. The 'cdf' guide table has guide_factor buckets
+    per cell.
+    """
+
+    def __init__(self, x, pdf, method='cdf', guide_factor=16):
+        self.x = np.asarray(x, dtype=float)
+        pdf = np.asarray(pdf, dtype=float)
+        self.width = np.diff(self.x)
+        self.left = pdf[:-1]
+        self.slope = np.diff(pdf) / self.width
+        self.mass = 0.5 * self.width * (pdf[:-1] + pdf[1:])
+        self.total = self.mass.sum()
+        self.method = method
+        if method == 'cdf':
+            self.cumulative = np.concatenate(([0], np.cumsum(self.mass)))
+            self.cumulative[-1] = self.total
+            self.upper = self.cumulative[1:].copy()
+            self.upper[-1] = np.inf
+            n_buckets = guide_factor * len(self.mass)
+            self.bucket_scale = n_buckets / self.total
+            self.guide = np.searchsorted(self.cumulative, np.arange(n_buckets) / self.bucket_scale,
+                                         side='right') - 1
+            np.minimum(self.guide, len(self.mass) - 1, out=self.guide)
+        elif method == 'alias':
+            self.probability, self.alias = alias_table(self.mass)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+
+    def _fill(self, out, rng):
+        n = len(out)
+        u = rng.random(n)
+        if self.method == 'cdf':
+            u *= self.total
+            bucket = (u * self.bucket_scale).astype(np.intp)
+            np.minimum(bucket, len(self.guide) - 1, out=bucket)
+            cell = self.guide[bucket]
+            # The guide entry is the first cell of the bucket; search the
+            # draws that lie past its end
+            missed = np.nonzero(self.upper[cell] <= u)[0]
+            cell[missed] = np.searchsorted(self.cumulative, u[missed], side='right') - 1
+            np.minimum(cell, len(self.mass) - 1, out=cell)
+            # Mass to cover inside the cell
+            r = u - self.cumulative[cell]
+        else:
+            u *= len(self.mass)
+            cell = u.astype(np.intp)
+            np.minimum(cell, len(self.mass) - 1, out=cell)
+            u -= cell
+            keep = u < self.probability[cell]
+            cell = np.where(keep, cell, self.alias[cell])
+            r = rng.random(n) * self.mass[cell]
+
+        # Offset t in the cell where left t + slope t^2 / 2 = r, in the
+        # cancellation-free form 2 r / (left + sqrt(left^2 + 2 slope r))
+        left = self.left[cell]
+        root = np.sqrt(np.maximum(left**2 + 2 * self.slope[cell] * r, 0))
+        denominator = left + root
+        t = np.divide(2 * r, denominator, out=np.zeros(n), where=denominator > 0)
+        np.minimum(t, self.width[cell], out=t)
+        np.add(self.x[cell], t, out=out)
+        return out
+
+    def sample(self, n_samples, rng=None, chunk_size=2**20, out=None):
+        """
+        n_samples positions drawn with the Generator rng (default_rng() if
+        None), written into out if given, chunk_size at a time.
+        """
+        rng = np.random.default_rng(rng)
+        if out is None:
+            out = np.empty(n_samples)
+        for start in range(0, n_samples, chunk_size):
+            self._fill(out[start:start + chunk_size], rng)
+        return out
+
+    def chunks(self, n_samples, rng=None, chunk_size=2**20):
+        """
+        Yields n_samples positions in chunks of at most chunk_size without
+        ever holding more than one chunk. The same buffer is yielded every
+        time, so copy a chunk if it has to outlive the next one.
+        """
+        rng = np.random.default_rng(rng)
+        buffer = np.empty(min(chunk_size, n_samples))
+        for start in range(0, n_samples, chunk_size):
+            chunk = buffer[:min(chunk_size, n_samples - start)]
+            yield self._fill(chunk, rng)
+
+    def sample_parallel(self, n_samples, seed=None, n_threads=None, chunk_size=2**20, out=None):
+        """
+        n_samples positions filled by n_threads threads (os.cpu_count() by
+        default), each drawing contiguous chunks from its own stream of
+        SeedSequence(seed).spawn(n_threads).
+        """
+        n_threads = n_threads or os.cpu_count() or 1
+        if out is None:
+            out = np.empty(n_samples)
+        streams = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_threads)]
+        bounds = np.linspace(0, n_samples, n_threads + 1).astype(int)
+        with ThreadPoolExecutor(n_threads) as pool:
+            jobs = [pool.submit(self.sample, hi - lo, rng, chunk_size, out[lo:hi])
+                    for rng, lo, hi in zip(streams, bounds[:-1], bounds[1:])]
+            for job in jobs:
+                job.result()
+        return out
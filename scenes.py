@@ -0,0 +1,418 @@
+"""
+The figure scripts as pure functions of a parameter dict.
+
+Each scene has a compute step, which takes a dict of parameters (missing
+keys fall back to the scene's defaults, the values of the original
+script) and returns a dict of arrays, and a render step, which draws
+that result on a new matplotlib Figure without going through pyplot, so
+rendering never opens a GUI window. Compute steps are cached on disk by
+array_cache, keyed on their parameters and on the source of the modules
+they use. SCENES maps the scene names used by sweep.py and
+latex_figures.py to (defaults, compute, render), and show opens a scene
+in a pyplot window, which is all the scripts below do.
+
+The defaults and the crystal sets are the only copy of the parameters:
+the scripts and the essay targets of latex_figures.py both read them
+from here, so editing one changes the figure and marks its target
+stale. matplotlib, scipy and the physics modules are imported inside the
+steps that use them, so importing this module (for SCENES or the
+defaults) costs little more than numpy.
+
+    interference_pattern    interference_pattern.py
+    interference_histogram  interference_histogram.py
+    kp_condition            plot_figures.py (CRYSTALS), plot_figures copy.py
+                            (WIDE_CRYSTALS), each set in one kp_condition_batch
+    double_slit             2d_wave.py
+    kp_potential            kp-potential.py
+    kp_diagram              kp-potential_2.py
+    potential_barrier       tunneling.py
+    epm_bands               pseudopotential.py (3D band diagram, no script)
+"""
+
+from collections import namedtuple
+import numpy as np
+
+import array_cache
+import landaubeta
+
+Scene = namedtuple('Scene', ['defaults', 'compute', 'render'])
+
+
+def with_defaults(defaults, params):
+    """defaults updated with params, rejecting unknown names"""
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    return {**defaults, **params}
+
+
+def _figure(figsize):
+    """A Figure not managed by pyplot, so rendering never opens a window"""
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+# --- interference_pattern.py ---
+# 0.2 mm wavelength, screen 1 m away, slits 10 mm apart and 2 mm wide,
+# 3 mm spread of the particle model
+INTERFERENCE_DEFAULTS = dict(wavelength=0.2e-3, L=1.0, d=0.01, a=0.002, sigma=0.003,
+                             x_max=0.06, n_points=3000)
+
+
+@array_cache.disk_cache(depends=['diffraction'])
+def interference_pattern(params):
+    """Area-normalised two-slit wave intensity and two-Gaussian particle model"""
+    from scipy.integrate import trapezoid
+    import diffraction
+    p = with_defaults(INTERFERENCE_DEFAULTS, params)
+    x = np.linspace(-p['x_max'], p['x_max'], int(p['n_points']))
+    wave = diffraction.two_slit_intensity(x, p['wavelength'], p['L'], p['d'], p['a'])
+    particle = (np.exp(-(x - p['d']/2)**2 / (2 * p['sigma']**2))
+                + np.exp(-(x + p['d']/2)**2 / (2 * p['sigma']**2)))
+    return dict(x=x, wave_norm=wave / trapezoid(wave, x),
+                particle_norm=particle / trapezoid(particle, x))
+
+
+def render_interference_pattern(result, params):
+    fig = _figure((6, 3))
+    ax = fig.add_subplot()
+    landaubeta.plot_decimated(ax, result['x'] * 1000, result['wave_norm'], label='Wave Model')
+    landaubeta.plot_decimated(ax, result['x'] * 1000, result['particle_norm'], label='Particle Model',
+                              linestyle='--')
+    ax.set_xlabel("Position on Screen", fontsize=12)
+    ax.set_ylabel("Probability Density", fontsize=12)
+    ax.legend()
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_xlim(-50, 50)
+    fig.tight_layout()
+    return fig
+
+
+# --- interference_histogram.py ---
+# The slits of interference_pattern.py and 5000 electron detections
+HISTOGRAM_DEFAULTS = dict(wavelength=0.2e-3, L=1.0, d=0.01, a=0.002, x_max=0.06, n_points=5000,
+                          n_samples=5000, n_bins=150, seed=0)
+
+
+@array_cache.disk_cache(depends=['diffraction', 'sampling', 'buildup'])
+def interference_histogram(params):
+    """Two-slit PDF and the normalised histogram of n_samples detections drawn from it"""
+    from scipy.integrate import trapezoid
+    import buildup
+    import diffraction
+    import sampling
+    p = with_defaults(HISTOGRAM_DEFAULTS, params)
+    x = np.linspace(-p['x_max'], p['x_max'], int(p['n_points']))
+    wave = diffraction.two_slit_intensity(x, p['wavelength'], p['L'], p['d'], p['a'])
+    pdf = wave / trapezoid(wave, x)
+    histogram = buildup.StreamingHistogram(x[0], x[-1], int(p['n_bins']))
+    for chunk in sampling.GridSampler(x, pdf).chunks(int(p['n_samples']), p['seed']):
+        histogram.update(chunk)
+    return dict(x=x, pdf=pdf, edges=histogram.edges, density=histogram.density())
+
+
+def render_interference_histogram(result, params):
+    fig = _figure((6, 3))
+    ax = fig.add_subplot()
+    landaubeta.plot_decimated(ax, result['x'] * 1000, result['pdf'] / 1000, linewidth=1.5,
+                              label=r"$|\psi|^2$")
+    ax.stairs(result['density'] / 1000, result['edges'] * 1000, fill=True, alpha=0.5,
+              label='Electron detections')
+    ax.set_xlabel("Position on Screen", fontsize=12)
+    ax.set_ylabel("Electron counts (normalized)", fontsize=12)
+    ax.legend(loc='upper right')
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_xlim(-50, 50)
+    fig.tight_layout()
+    return fig
+
+
+# --- plot_figures.py ---
+# Lattice constant a (m), well width b_ratio * a and well depth V_0 (eV),
+# on n_energies energies up to E_max (eV)
+KP_CONDITION_DEFAULTS = dict(a=5.43e-10, b_ratio=0.1, V_0=-12.0, E_max=100.0, n_energies=20000,
+                             fig_width=4*.7)
+
+# Cu, Si and NaCl with wells 0.1 a wide (plot_figures.py)
+CRYSTALS = {
+    'copper': dict(a=3.61e-10, V_0=-4.5),
+    'silicon': dict(a=5.43e-10, V_0=-12.0),
+    'nacl': dict(a=5.64e-10, V_0=-40.0),
+}
+
+# Cu, Si and NaCl with wells 0.5, 1.1 and 2.82 A wide, in wider figures
+# (plot_figures copy.py)
+WIDE_CRYSTALS = {
+    'copper': dict(a=3.6147e-10, b_ratio=0.5 / 3.6147, V_0=-11.7, fig_width=8*.7),
+    'silicon': dict(a=5.431e-10, b_ratio=1.1 / 5.431, V_0=-15.0, fig_width=8*.7),
+    'nacl': dict(a=5.64e-10, b_ratio=2.82 / 5.64, V_0=-12.0, fig_width=8*.7),
+}
+
+
+@array_cache.disk_cache(depends=['kp_bands'])
+def kp_condition_batch(crystals):
+    """
+    kp_condition of a list of parameter dicts in one kp_bands call. The
+    crystals must share E_max and n_energies; f has one row per crystal
+    and band_rows gives the crystal of each band.
+    """
+    import kp_bands
+    ps = [with_defaults(KP_CONDITION_DEFAULTS, params) for params in crystals]
+    if len({(p['E_max'], int(p['n_energies'])) for p in ps}) > 1:
+        raise ValueError("Crystals of one batch must share E_max and n_energies")
+    E = np.linspace(0, ps[0]['E_max'] * kp_bands.eV, int(ps[0]['n_energies']))
+    a = np.array([p['a'] for p in ps])
+    b = np.array([p['b_ratio'] for p in ps]) * a
+    V_0 = np.array([p['V_0'] for p in ps]) * kp_bands.eV
+    f = kp_bands.kp_condition(E, a, b, V_0)
+    band_rows, bands = kp_bands.band_edges(a, b, V_0, E[-1])
+    return dict(E=E, f=f, band_rows=band_rows, bands=bands)
+
+
+def kp_condition_row(batch, i):
+    """The result of crystal i of a kp_condition_batch, as kp_condition returns it"""
+    return dict(E=batch['E'], f=batch['f'][i], bands=batch['bands'][batch['band_rows'] == i])
+
+
+def kp_condition(params):
+    """cos(ka) + (q/k) sin(ka) and the allowed bands of one crystal; V_0 and E_max in eV"""
+    return kp_condition_row(kp_condition_batch([params]), 0)
+
+
+def render_kp_condition(result, params):
+    from kp_bands import eV
+    p = with_defaults(KP_CONDITION_DEFAULTS, params)
+    fig = _figure((p['fig_width'], 2.5*.7))
+    ax = fig.add_subplot()
+    E = result['E'] / eV
+    landaubeta.plot_decimated(ax, E, result['f'], label=r"$\cos(ka) + (q/k) \sin(ka)$")
+    landaubeta.plot_decimated(ax, E, np.ones_like(E), 'r--', label="Limits")
+    landaubeta.plot_decimated(ax, E, -np.ones_like(E), 'r--')
+    for E_start, E_end in result['bands']:
+        ax.axvspan(E_start / eV, E_end / eV, color='C0', alpha=0.2, zorder=0)
+    ax.set_xlabel('Electron Energy (eV)')
+    ax.set_ylabel(r"$\cos(ka) + (q/k) \sin(ka)$")
+    ax.set_ylim(-4, 4)
+    fig.tight_layout()
+    return fig
+
+
+# --- 2d_wave.py ---
+# grid_size^2 points on a width x height domain, slits slit_dist apart in
+# a wall at slit_x
+DOUBLE_SLIT_DEFAULTS = dict(grid_size=400, width=20.0, height=10.0, wavelength=0.5,
+                            slit_dist=1.5, slit_x=4.0)
+
+
+@array_cache.disk_cache(depends=['wave_field'])
+def double_slit(params):
+    """Plane wave before the slits and two circular waves after them"""
+    import wave_field
+    p = with_defaults(DOUBLE_SLIT_DEFAULTS, params)
+    field = wave_field.DoubleSlitField(int(p['grid_size']), p['width'], p['height'])
+    return dict(wave=field.evaluate(p['wavelength'], p['slit_dist'], p['slit_x']))
+
+
+def render_double_slit(result, params):
+    p = with_defaults(DOUBLE_SLIT_DEFAULTS, params)
+    fig = _figure((6, 3))
+    ax = fig.add_subplot()
+    ax.imshow(result['wave'], extent=[0, p['width'], 0, p['height']], origin='lower',
+              cmap='seismic', interpolation='bilinear', vmin=-1.5, vmax=1.5)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    fig.tight_layout()
+    return fig
+
+
+# --- kp-potential.py ---
+KP_POTENTIAL_DEFAULTS = dict(num_atoms=5, lattice_const=20.0, well_width=1.0, v0=-20.0,
+                             r_min=1e-3, num_points=5000)
+
+
+@array_cache.disk_cache(depends=['lattice_potential'])
+def kp_potential(params):
+    """Coulomb chain -1/|x| and its Kronig-Penney wells"""
+    import lattice_potential
+    p = with_defaults(KP_POTENTIAL_DEFAULTS, params)
+    num_atoms = int(p['num_atoms'])
+    x = np.linspace(-2, (num_atoms - 1) * p['lattice_const'] + 2, int(p['num_points']))
+    v_real = lattice_potential.coulomb_chain(x, num_atoms, p['lattice_const'], r_min=p['r_min'])
+    centers = lattice_potential.chain_centers(num_atoms, p['lattice_const'])
+    v_kp = lattice_potential.kp_wells(x, centers, p['well_width'], p['v0'])
+    return dict(x=x, v_real=v_real, v_kp=v_kp)
+
+
+def render_kp_potential(result, params):
+    fig = _figure((12, 6))
+    ax = fig.add_subplot()
+    landaubeta.plot_decimated(ax, result['x'], result['v_real'],
+                              label=r"Realistic Potential ($-1/|x|$)", color='royalblue', lw=1.5)
+    # Only the runs of the wells are reduced, which keeps the steps exact
+    ax.step(*landaubeta.decimate(result['x'], result['v_kp']), label="Kronig-Penney (Negative Wells)",
+            color='crimson', where='mid', lw=2.5, alpha=0.9)
+    ax.set_title("Atomic Potential vs. Kronig-Penney Model (Negative Wells)", fontsize=14)
+    ax.set_xlabel("Position ($x$)", fontsize=12)
+    ax.set_ylabel("Potential Energy $V(x)$", fontsize=12)
+    ax.axhline(0, color='black', linewidth=0.8, linestyle='--')
+    ax.set_ylim(-10, 1)
+    ax.legend(loc='lower right')
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+# --- kp-potential_2.py ---
+KP_DIAGRAM_DEFAULTS = dict(num_atoms=5, lattice_const=20.0, well_width=1.0, v0=-20.0, strength=1.8,
+                           r_min=0.15, num_points=3000)
+
+
+@array_cache.disk_cache(depends=['lattice_potential'])
+def kp_diagram(params):
+    """Coulomb chain and Kronig-Penney wells of the essay's diagram of the model"""
+    import lattice_potential
+    p = with_defaults(KP_DIAGRAM_DEFAULTS, params)
+    num_atoms = int(p['num_atoms'])
+    x = np.linspace(-1, (num_atoms - 1) * p['lattice_const'] + 2, int(p['num_points']))
+    v_real = lattice_potential.coulomb_chain(x, num_atoms, p['lattice_const'], strength=p['strength'],
+                                             r_min=p['r_min'])
+    centers = lattice_potential.chain_centers(num_atoms, p['lattice_const'])
+    v_kp = lattice_potential.kp_wells(x, centers, p['well_width'], p['v0'])
+    return dict(x=x, v_real=v_real, v_kp=v_kp)
+
+
+def render_kp_diagram(result, params):
+    p = with_defaults(KP_DIAGRAM_DEFAULTS, params)
+    num_atoms = int(p['num_atoms'])
+    fig = _figure((9, 4.5))
+    ax = fig.add_subplot()
+    landaubeta.plot_decimated(ax, result['x'], result['v_real'], color='#1f77b4', lw=2,
+                              label="Atomic Potential")
+    landaubeta.plot_decimated(ax, result['x'], result['v_kp'], color='#d62728', lw=2.5,
+                              label="Kronig-Penney")
+    # x axis at V = 0 and V axis at the left end, arrows at their ends
+    ax.spines['bottom'].set_position('zero')
+    ax.spines['left'].set_position(('data', -1))
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.plot(1, 0, ">k", transform=ax.get_yaxis_transform(), clip_on=False)
+    ax.plot(-1, 1, "^k", transform=ax.get_xaxis_transform(), clip_on=False)
+    ax.text(1.03, 0, '$x$', transform=ax.get_yaxis_transform(),
+            ha='left', va='center', fontsize=14, fontweight='bold')
+    ax.text(-1, 1.05, '$V(x)$', transform=ax.get_xaxis_transform(),
+            ha='center', va='bottom', fontsize=14, fontweight='bold')
+    # Atom positions 0, 1a, 2a, ... above the x axis
+    ax.set_xticks([i * p['lattice_const'] for i in range(num_atoms)],
+                  ['0'] + [f'${i}a$' for i in range(1, num_atoms)], fontsize=14)
+    ax.tick_params(axis='x', pad=-25)
+    ax.set_yticks([])
+    ax.set_ylim(-10, 2)
+    ax.legend(loc='lower right')
+    return fig
+
+
+# --- tunneling.py ---
+# Thin, tall barrier centred at x = 0 and the wave number of the incident wave
+BARRIER_DEFAULTS = dict(barrier_width=0.2, barrier_height=100.0, k=2 * np.pi, n_points=10000)
+
+
+def potential_barrier(params):
+    """Thin, tall barrier and the real part of the incident wave"""
+    p = with_defaults(BARRIER_DEFAULTS, params)
+    x = np.linspace(-5, 5, int(p['n_points']))
+    potential = np.where(np.abs(x) < p['barrier_width'] / 2, p['barrier_height'], 0.0)
+    x_incident = x[x < -0.2]
+    return dict(x=x, potential=potential, x_incident=x_incident,
+                incident=5 * np.cos(p['k'] * x_incident) + p['barrier_height'] / 2)
+
+
+def render_potential_barrier(result, params):
+    p = with_defaults(BARRIER_DEFAULTS, params)
+    fig = _figure((6, 4))
+    ax = fig.add_subplot()
+    landaubeta.plot_decimated(ax, result['x'], result['potential'], 'r', linewidth=2,
+                              label='Potential Barrier')
+    ax.fill_between(*landaubeta.decimate(result['x'], result['potential']), 0, color='red', alpha=0.3)
+    landaubeta.plot_decimated(ax, result['x_incident'], result['incident'], 'b--', label='Incident Wave')
+    ax.set_xlabel('Position (x)')
+    ax.set_ylabel('Amplitude / Potential')
+    ax.set_xticks([-p['barrier_width']/2, p['barrier_width']/2], [r'$-b/2$', r'$b/2$'])
+    labels = ax.get_xticklabels()
+    labels[0].set_horizontalalignment('right')
+    labels[1].set_horizontalalignment('left')
+    ax.set_yticks([p['barrier_height'], p['barrier_height']/2], [r'$V_0$', r"$E$"])
+    ax.set_ylim(-1.5, p['barrier_height'] + 10)
+    ax.legend()
+    ax.grid(True, linestyle=':', alpha=0.7)
+    return fig
+
+
+# --- pseudopotential.py ---
+EPM_DEFAULTS = dict(material='Si', path='L-G-X-U|K-G', n_points=200, n_bands=8, g2_max=21,
+                    E_min=-13.0, E_max=7.0)
+
+
+@array_cache.disk_cache(depends=['pseudopotential'])
+def epm_bands(params):
+    """Lowest bands of a crystal of pseudopotential.CRYSTALS along an fcc k-path, in eV"""
+    import pseudopotential
+    p = with_defaults(EPM_DEFAULTS, params)
+    k, distance, ticks, _ = pseudopotential.fcc_path(p['path'], int(p['n_points']))
+    E = pseudopotential.band_structure(p['material'], k, int(p['n_bands']), p['g2_max'], n_workers=1)
+    return dict(distance=distance, E=E, ticks=ticks)
+
+
+def render_epm_bands(result, params):
+    import pseudopotential
+    p = with_defaults(EPM_DEFAULTS, params)
+    _, _, _, labels = pseudopotential.fcc_path(p['path'], 2)
+    crystal = pseudopotential.CRYSTALS[p['material']]
+    E = result['E']
+    if crystal.valence_bands:
+        # Zero of energy at the top of the valence band
+        E = E - E[:, crystal.valence_bands - 1].max()
+    fig = _figure((4, 3))
+    ax = fig.add_subplot()
+    ax.plot(result['distance'], E, color='C0', lw=1.2)
+    for tick in result['ticks'][1:-1]:
+        ax.axvline(tick, color='black', lw=0.5)
+    ax.axhline(0, color='gray', lw=0.5, linestyle='--')
+    ax.set_xticks(result['ticks'], [label.replace('G', r'$\Gamma$') for label in labels])
+    ax.set_xlim(result['distance'][0], result['distance'][-1])
+    ax.set_ylim(p['E_min'], p['E_max'])
+    ax.set_ylabel('Energy (eV)')
+    ax.set_title(p['material'])
+    fig.tight_layout()
+    return fig
+
+
+SCENES = {
+    'interference_pattern': Scene(INTERFERENCE_DEFAULTS, interference_pattern,
+                                  render_interference_pattern),
+    'interference_histogram': Scene(HISTOGRAM_DEFAULTS, interference_histogram,
+                                    render_interference_histogram),
+    'kp_condition': Scene(KP_CONDITION_DEFAULTS, kp_condition, render_kp_condition),
+    'double_slit': Scene(DOUBLE_SLIT_DEFAULTS, double_slit, render_double_slit),
+    'kp_potential': Scene(KP_POTENTIAL_DEFAULTS, kp_potential, render_kp_potential),
+    'kp_diagram': Scene(KP_DIAGRAM_DEFAULTS, kp_diagram, render_kp_diagram),
+    'potential_barrier': Scene(BARRIER_DEFAULTS, potential_barrier, render_potential_barrier),
+    'epm_bands': Scene(EPM_DEFAULTS, epm_bands, render_epm_bands),
+}
+
+
+def show(name, params=None, result=None):
+    """
+    Renders a scene in a pyplot window, as the original scripts did with
+    plt.show(). result is computed from params unless given. Returns it.
+    """
+    import matplotlib.pyplot as plt
+    params = params or {}
+    scene = SCENES[name]
+    if result is None:
+        result = scene.compute(params)
+    # pyplot adopts a Figure created without it
+    plt.figure(scene.render(result, params))
+    plt.show()
+    return result
@@ -0,0 +1,57 @@
+"""
+Finite-difference eigenstates of H = -hbar^2/2m d^2/dx^2 + V(x) in 1D.
+
+The second derivative on a uniform grid gives a symmetric tridiagonal
+Hamiltonian (psi = 0 just outside the grid), so only the lowest few
+eigenpairs are computed, either with LAPACK's tridiagonal bisection
+(scipy.linalg.eigh_tridiagonal) or by shift-invert Lanczos on a sparse
+matrix (scipy.sparse.linalg.eigsh). Memory stays O(grid x n_states).
+Units follow transfer_matrix.py: hbar^2 / 2m = 1 unless hbar2_2m is given.
+"""
+
+import numpy as np
+from scipy.linalg import eigh_tridiagonal, eigvalsh_tridiagonal
+from scipy.sparse import diags
+from scipy.sparse.linalg import eigsh
+
+
+def hamiltonian_bands(x, v, hbar2_2m=1.0):
+    """Diagonal and off-diagonal of the finite-difference Hamiltonian"""
+    x = np.asarray(x, dtype=float)
+    dx = x[1] - x[0]
+    t = hbar2_2m / dx**2
+    diagonal = np.asarray(v, dtype=float) + 2 * t
+    off_diagonal = np.full(len(x) - 1, -t)
+    return diagonal, off_diagonal
+
+
+def lowest_states(x, v, n_states=10, hbar2_2m=1.0, method='tridiagonal', sigma=None):
+    """
+    Lowest n_states eigenpairs of H on the uniform grid x.
+
+    method is 'tridiagonal' (eigh_tridiagonal restricted to the lowest
+    indices) or 'shift-invert' (the n_states eigenvalues of eigsh nearest
+    sigma, by default just below the ground state). Shift-invert is the
+    better choice for states deep inside the spectrum; for the bottom of
+    nearly degenerate bands bisection converges faster. Returns
+    (energies, psi) with psi of shape (len(x), n_states), normalised so
+    that sum |psi|^2 dx = 1.
+    """
+    diagonal, off_diagonal = hamiltonian_bands(x, v, hbar2_2m)
+    if method == 'tridiagonal':
+        energies, psi = eigh_tridiagonal(diagonal, off_diagonal, select='i',
+                                         select_range=(0, n_states - 1))
+    elif method == 'shift-invert':
+        if sigma is None:
+            E_0 = eigvalsh_tridiagonal(diagonal, off_diagonal, select='i', select_range=(0, 0))[0]
+            sigma = E_0 - 1e-6 * max(abs(E_0), 1)
+        H = diags([off_diagonal, diagonal, off_diagonal], [-1, 0, 1], format='csc')
+        energies, psi = eigsh(H, k=n_states, sigma=sigma, which='LM')
+        order = np.argsort(energies)
+        energies, psi = energies[order], psi[:, order]
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    dx = x[1] - x[0]
+    psi /= np.sqrt(dx)
+    return energies, psi
@@ -0,0 +1,141 @@
+"""
+Parameter sweeps of the figure scenes over a process pool.
+
+A sweep takes one scene of scenes.SCENES and a list of parameter dicts,
+either the Cartesian product of value lists (cartesian_grid) or a Latin
+hypercube sample of ranges (latin_hypercube). Every variant is computed
+and rendered with the Agg backend in a worker process and saved as soon
+as it is done; one JSON line per finished variant (parameters, output
+file, time) is appended to manifest.jsonl in the output directory, so an
+interrupted sweep keeps everything finished so far.
+
+Usage:
+    python sweep.py double_slit wavelength=0.3,0.5,0.8 slit_dist=1,1.5,2
+    python sweep.py interference_pattern d=0.005:0.02 a=0.001:0.003 --lhs 100
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import itertools
+import json
+import os
+import time
+import numpy as np
+
+
+def cartesian_grid(space):
+    """Every combination of space = {name: [values]} as a list of dicts"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def latin_hypercube(space, n_samples, seed=None):
+    """
+    n_samples dicts from space = {name: (low, high)} or (low, high, 'log'),
+    with every range split into n_samples strata that each hold exactly
+    one sample. 'log' ranges are stratified in log space.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, bounds in space.items():
+        low, high = bounds[:2]
+        log = len(bounds) > 2 and bounds[2] == 'log'
+        u = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+        if log:
+            columns[name] = np.exp(np.log(low) + u * (np.log(high) - np.log(low)))
+        else:
+            columns[name] = low + u * (high - low)
+    return [{name: float(column[i]) for name, column in columns.items()} for i in range(n_samples)]
+
+
+def _init_worker(style):
+    import matplotlib
+    matplotlib.use('Agg')
+    if style:
+        import landaubeta
+        getattr(landaubeta, style)()
+
+
+def render_variant(scene_name, params, path, dpi=150, save_data=False):
+    """Computes and renders one variant into path; returns the seconds taken"""
+    import scenes
+    start = time.perf_counter()
+    scene = scenes.SCENES[scene_name]
+    result = scene.compute(params)
+    if save_data:
+        np.savez(os.path.splitext(path)[0] + '.npz', **result)
+    fig = scene.render(result, params)
+    fig.savefig(path, dpi=dpi)
+    return time.perf_counter() - start
+
+
+def run_sweep(scene_name, grid, out_dir, n_workers=None, fmt='png', dpi=150, style=None,
+              save_data=False):
+    """
+    Renders scene_name for every parameter dict in grid into out_dir,
+    using n_workers processes (os.cpu_count() by default). style names a
+    landaubeta function (e.g. 'use_IEEE_style') applied in every worker.
+    Returns the manifest records in completion order.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = os.path.join(out_dir, 'manifest.jsonl')
+    digits = len(str(max(len(grid) - 1, 0)))
+    records = []
+    with ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(style,)) as pool, \
+            open(manifest, 'a', encoding='utf-8') as log:
+        jobs = {}
+        for i, params in enumerate(grid):
+            path = os.path.join(out_dir, f"{scene_name}_{i:0{digits}d}.{fmt}")
+            job = pool.submit(render_variant, scene_name, params, path, dpi, save_data)
+            jobs[job] = (i, params, path)
+        for job in as_completed(jobs):
+            i, params, path = jobs[job]
+            record = dict(scene=scene_name, index=i, params=params, path=path)
+            try:
+                record['seconds'] = job.result()
+            except Exception as error:
+                record['error'] = repr(error)
+            log.write(json.dumps(record) + '\n')
+            log.flush()
+            records.append(record)
+    return records
+
+
+def _parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a parameter sweep of a figure scene")
+    parser.add_argument('scene')
+    parser.add_argument('params', nargs='*',
+                        help="name=v1,v2,... (grid) or name=low:high[:log] (with --lhs)")
+    parser.add_argument('--lhs', type=int, help="number of Latin hypercube samples")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--out', default='sweeps')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--format', default='png')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--style', help="landaubeta style function, e.g. use_IEEE_style")
+    parser.add_argument('--save-data', action='store_true', help="also save the arrays as .npz")
+    args = parser.parse_args()
+
+    space = {}
+    for item in args.params:
+        name, values = item.split('=', 1)
+        if args.lhs:
+            parts = values.split(':')
+            space[name] = tuple(float(v) for v in parts[:2]) + tuple(parts[2:])
+        else:
+            space[name] = [_parse_value(v) for v in values.split(',')]
+    grid = latin_hypercube(space, args.lhs, args.seed) if args.lhs else cartesian_grid(space)
+
+    start = time.perf_counter()
+    records = run_sweep(args.scene, grid, os.path.join(args.out, args.scene), args.workers,
+                        args.format, args.dpi, args.style, args.save_data)
+    failed = sum('error' in r for r in records)
+    print(f"{len(records) - failed} variants rendered, {failed} failed, "
+          f"in {time.perf_counter() - start:.1f} s")
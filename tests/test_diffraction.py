@@ -0,0 +1,44 @@
+"""FFT and angular-spectrum diffraction against the closed-form slit patterns"""
+
+import numpy as np
+import pytest
+
+import diffraction
+
+
+@pytest.mark.parametrize("n_slits", [1, 2, 7])
+def test_fraunhofer_screen_matches_closed_form(n_slits):
+    wavelength, L, d, a = 0.2e-3, 1.0, 0.01, 0.002
+    x = np.linspace(-0.06, 0.06, 1001)
+    dx = a / 40
+    grid = np.arange(-(n_slits + 1) * d / 2, (n_slits + 1) * d / 2, dx)
+    aperture = diffraction.slit_mask(grid, diffraction.grating_centers(n_slits, d), a)
+    pattern = diffraction.fraunhofer_screen(aperture, dx, (x,), wavelength, L)
+    exact = diffraction.n_slit_intensity(x, wavelength, L, n_slits, d, a)
+    assert np.max(np.abs(pattern - exact)) < 0.01
+
+
+def test_fraunhofer_screen_batches_wavelengths_and_distances():
+    d, a = 0.01, 0.002
+    x = np.linspace(-0.06, 0.06, 501)
+    wavelengths, distances = np.array([0.1e-3, 0.2e-3]), np.array([0.5, 1.0, 2.0])
+    dx = a / 40
+    aperture = diffraction.slit_mask(np.arange(-d, d, dx), diffraction.grating_centers(2, d), a)
+    pattern = diffraction.fraunhofer_screen(aperture, dx, (x,), wavelengths, distances)
+    assert pattern.shape == (2, 3, len(x))
+    exact = diffraction.two_slit_intensity(x, wavelengths[:, None, None], distances[:, None], d, a)
+    assert np.max(np.abs(pattern - exact)) < 0.01
+
+
+def test_fresnel_far_field_matches_two_slit_pattern():
+    # Fresnel number (d / 2)^2 / (wavelength z) = 0.02: the near-field
+    # propagation reaches the Fraunhofer regime
+    wavelength, z, d, a = 0.5e-6, 30.0, 1e-3, 0.2e-3
+    dx = a / 20
+    grid = np.arange(-0.2, 0.2, dx)
+    aperture = diffraction.slit_mask(grid, diffraction.grating_centers(2, d), a)
+    intensity = np.abs(diffraction.fresnel(aperture, dx, wavelength, z))**2
+    intensity /= intensity[np.argmin(np.abs(grid))]
+    exact = diffraction.n_slit_intensity(grid, wavelength, z, 2, d, a)
+    screen = np.abs(grid) < 0.1
+    assert np.max(np.abs(intensity - exact)[screen]) < 0.01
@@ -0,0 +1,35 @@
+"""Batched chi-squared goodness of fit"""
+
+import numpy as np
+import pytest
+
+import landaubeta
+
+
+def line(x, a, b):
+    return a * x + b
+
+
+X = np.linspace(0, 1, 20)
+POPTS = np.array([[1.0, 0.0], [2.0, 0.5], [3.0, -1.0]])
+Y = line(X, POPTS[:, :1], POPTS[:, 1:]) + 0.1 * np.sin(7 * X)
+
+
+def test_batch_matches_per_fit_chi2():
+    y_err = np.full((3, len(X)), 0.05)
+    stats = landaubeta.calculate_p_value_chi_batch(X, Y, line, POPTS, y_err=y_err)
+    expected = [np.sum(((y - line(X, *p)) / 0.05) ** 2) for y, p in zip(Y, POPTS)]
+    np.testing.assert_allclose(stats['chi2'], expected)
+    assert list(stats['dof']) == [18, 18, 18]
+
+
+@pytest.mark.parametrize("n_rows", [2, 4])
+def test_y_err_rows_must_match_parameter_sets(n_rows):
+    with pytest.raises(ValueError, match=f"y_err has {n_rows} rows, expected 1 or 3"):
+        landaubeta.calculate_p_value_chi_batch(X, Y, line, POPTS, y_err=np.ones((n_rows, len(X))))
+
+
+def test_shared_y_err_row_is_broadcast():
+    stats = landaubeta.calculate_p_value_chi_batch(X, Y, line, POPTS, y_err=np.full(len(X), 0.05))
+    per_fit = landaubeta.calculate_p_value_chi_batch(X, Y, line, POPTS, y_err=np.full((3, len(X)), 0.05))
+    np.testing.assert_array_equal(stats, per_fit)
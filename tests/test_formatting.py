@@ -0,0 +1,42 @@
+"""Array value/error formatters against their scalar versions"""
+
+import numpy as np
+import pytest
+
+import landaubeta
+
+
+VALUES = [1.23456, -0.0123456, 1234.567, 9.87654e-5, 42.0, 0.5, 3.0]
+ERRORS = [0.012, 0.00034, 12.3, 2.1e-6, 5.0, 0.0, -0.05]
+
+
+def test_format_value_error_array_matches_scalar():
+    value_strings, error_strings = landaubeta.format_value_error_array(VALUES, ERRORS)
+    expected = [landaubeta.format_value_error(v, e) for v, e in zip(VALUES, ERRORS)]
+    assert list(zip(value_strings, error_strings)) == expected
+
+
+def test_latex_format_array_matches_scalar():
+    expected = [landaubeta.latex_format(v, e) for v, e in zip(VALUES, ERRORS)]
+    assert list(landaubeta.latex_format_array(VALUES, ERRORS)) == expected
+
+
+def test_zero_error_formats_value_alone():
+    value_strings, error_strings = landaubeta.format_value_error_array([2.5, 1 / 3], [0.0, -0.0])
+    assert list(value_strings) == ["2.5", "0.333333"]
+    assert list(error_strings) == ["0", "0"]
+    assert list(landaubeta.latex_format_array([2.5], [0.0])) == ["$2.5$"]
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+def test_non_finite_errors_raise(bad):
+    with pytest.raises(ValueError, match="errors must be finite"):
+        landaubeta.format_value_error_array([1.0, 2.0], [0.1, bad])
+    with pytest.raises(ValueError, match="errors must be finite"):
+        landaubeta.latex_format_array([1.0, 2.0], [0.1, bad])
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf])
+def test_non_finite_values_raise_in_latex_format_array(bad):
+    with pytest.raises(ValueError, match="values must be finite"):
+        landaubeta.latex_format_array([bad, 2.0], [0.1, 0.1])
@@ -0,0 +1,97 @@
+"""The essay targets against their scripts, and their parameters"""
+
+import ast
+import io
+import os
+import re
+import zlib
+
+import pytest
+from matplotlib.ticker import FixedLocator
+
+import latex_figures
+import scenes
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def no_disk_cache(monkeypatch):
+    monkeypatch.setenv('ARRAY_CACHE', '0')
+
+
+def shown_scenes(script):
+    """Scene names the script passes to scenes.show"""
+    with open(os.path.join(HERE, script), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return {node.args[0].value for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and ast.unparse(node.func) == 'scenes.show'
+            and node.args and isinstance(node.args[0], ast.Constant)}
+
+
+def committed_text(name):
+    """Letters and digits of the text drawn in the committed PDF, in order"""
+    with open(os.path.join(HERE, 'latex', name), 'rb') as f:
+        data = f.read()
+    strings = []
+    for stream in re.findall(rb'stream\r?\n(.*?)\r?\nendstream', data, re.S):
+        try:
+            strings += re.findall(rb'\((.*?)\)', zlib.decompress(stream))
+        except zlib.error:
+            continue
+    return re.sub(r'[^A-Za-z0-9]', '', b''.join(strings).decode('latin-1'))
+
+
+@pytest.mark.parametrize("name", sorted(latex_figures.FIGURES))
+def test_target_scene_is_drawn_by_its_script(name):
+    target = latex_figures.FIGURES[name]
+    assert all(os.path.exists(os.path.join(HERE, source)) for source in target.sources)
+    # The first source is the script that drew the committed figure
+    assert target.scene in shown_scenes(target.sources[0])
+
+    # and the scene draws the text the committed figure shows: the fixed
+    # tick labels, axis labels, legend entries and annotations
+    fig = latex_figures.figure_builder(target.scene, target.params)()
+    ax = fig.axes[0]
+    labels = [ax.get_xlabel(), ax.get_ylabel()] + [text.get_text() for text in ax.texts]
+    if ax.get_legend():
+        labels += [text.get_text() for text in ax.get_legend().get_texts()]
+    for axis in (ax.xaxis, ax.yaxis):
+        if isinstance(axis.get_major_locator(), FixedLocator):
+            labels += [label.get_text() for label in axis.get_ticklabels()]
+    text = committed_text(name)
+    for label in labels:
+        # TeX commands (\psi, \cos) are drawn as glyphs of their own
+        for word in re.findall(r'[A-Za-z0-9]+', re.sub(r'\\[A-Za-z]+', ' ', label)):
+            assert word in text, f"{label!r} is not in latex/{name}"
+
+
+def test_kp_potential_is_the_arrow_diagram():
+    fig = latex_figures.figure_builder('kp_diagram', {})()
+    ax = fig.axes[0]
+    assert [label.get_text() for label in ax.get_xticklabels()] == ['0', '$1a$', '$2a$', '$3a$', '$4a$']
+    assert {text.get_text() for text in ax.texts} == {'$x$', '$V(x)$'}
+    assert tuple(fig.get_size_inches()) == (9, 4.5)
+
+
+def rendered(name):
+    target = latex_figures.FIGURES[name]
+    buffer = io.BytesIO()
+    latex_figures.figure_builder(target.scene, target.params)().savefig(buffer, format='png')
+    return latex_figures.target_digest(name), buffer.getvalue()
+
+
+@pytest.mark.parametrize("name, parameters, key, value", [
+    ('bands_silicon.pdf', scenes.CRYSTALS['silicon'], 'V_0', -20.0),
+    ('bands_silicon_wide.pdf', scenes.WIDE_CRYSTALS['silicon'], 'b_ratio', 0.5),
+    ('potential_barrier.pdf', scenes.BARRIER_DEFAULTS, 'barrier_width', 0.5),
+    ('kp_potential.pdf', scenes.KP_DIAGRAM_DEFAULTS, 'lattice_const', 15.0),
+])
+def test_parameter_edit_changes_output(monkeypatch, name, parameters, key, value):
+    digest, image = rendered(name)
+    # The dicts of scenes.py the scripts read are the ones the target renders
+    monkeypatch.setitem(parameters, key, value)
+    edited_digest, edited_image = rendered(name)
+    assert edited_digest != digest
+    assert edited_image != image
+
@@ -0,0 +1,282 @@
+"""
+Transfer-matrix solver for piecewise-constant one-dimensional potentials.
+
+A potential is given by the segment boundaries ``edges`` (length n + 1)
+and the constant value of V on each segment (length n), as returned by
+segments_from_samples for the sampled arrays built in tunneling.py and
+kp-potential.py. Energies and potentials share units and lengths are in
+units where hbar^2 / 2m = 1 unless hbar2_2m says otherwise.
+
+Each segment maps (psi, psi') from its left edge to its right edge with a
+real 2x2 matrix. Matrices are stored as (2, 2, ...) arrays so products are
+batched over the energy array. An arbitrary chain is multiplied layer by
+layer over cache-sized chunks of energies, in threads; a periodic one by
+repeated squaring of its cell in log2(n) products. Evanescent segments
+carry their growth as a separate logarithmic scale, the running product
+is renormalised to unit max entry, and the transmission is assembled in
+logs, so thick barriers and long random chains make it underflow to 0
+instead of giving inf/nan.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def segments_from_samples(x, v):
+    """
+    Collapses a sampled piecewise-constant V(x) into (edges, values).
+
+    Boundaries are placed halfway between the samples where v changes.
+    """
+    x = np.asarray(x, dtype=float)
+    v = np.asarray(v, dtype=float)
+    change = np.nonzero(np.diff(v))[0] + 1
+    values = v[np.concatenate(([0], change))]
+    edges = np.concatenate(([x[0]], 0.5 * (x[change - 1] + x[change]), [x[-1]]))
+    return edges, values
+
+
+def _segment_terms(widths, values, E, hbar2_2m, out):
+    """
+    Entries of the normalised segment matrices, written into the six
+    (n_segments, n_E) arrays of out: diag (both diagonal entries), M01,
+    M10, log_scale and two scratch arrays. The steps run in place, so a
+    caller looping over blocks of segments allocates almost nothing.
+    """
+    diag, m01, m10, log_scale, k, t = out
+    d = widths[:, None]
+    np.subtract(E[None, :], values[:, None], out=k)
+    if hbar2_2m != 1:
+        k /= hbar2_2m
+    osc = k > 0
+    np.abs(k, out=k)
+    np.sqrt(k, out=k)
+    kd = np.multiply(k, d, out=log_scale)
+
+    # Oscillating: [[cos kd, sin(kd)/k], [-k sin kd, cos kd]], with cos and
+    # sin from t = tan(kd/2): NumPy vectorises tan, while float64 sin and
+    # cos each cost ten times as much
+    np.multiply(kd, 0.5, out=t)
+    np.tan(t, out=t)
+    np.multiply(t, t, out=m10)
+    np.subtract(1, m10, out=diag)
+    m10 += 1
+    diag /= m10
+    t /= m10
+    t *= 2
+    # Evanescent: cosh, sinh/kappa, kappa sinh with e^(kappa d) factored out
+    if osc.all():
+        log_scale[...] = 0
+    else:
+        growing = ~osc
+        decay = np.exp(-2 * kd[growing])
+        diag[growing] = 0.5 * (1 + decay)
+        t[growing] = 0.5 * (1 - decay)
+        log_scale[osc] = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(t, k, out=m01)
+        np.multiply(k, t, out=m10)
+    np.negative(m10, out=m10, where=osc)
+    # Zero kinetic energy: psi is linear across the segment
+    zero = k == 0
+    if zero.any():
+        np.copyto(m01, np.broadcast_to(d, m01.shape), where=zero)
+    return diag, m01, m10, log_scale
+
+
+def segment_matrices(widths, values, E, hbar2_2m=1.0):
+    """
+    Normalised transfer matrices of every segment at every energy.
+
+    Returns (M, log_scale) with M of shape (2, 2, n_segments, n_E); the
+    true matrix is M * exp(log_scale).
+    """
+    E = np.asarray(E, dtype=float)
+    widths = np.asarray(widths, dtype=float)
+    values = np.asarray(values, dtype=float)
+    shape = (len(widths), len(E))
+    M = np.empty((2, 2) + shape)
+    log_scale = np.empty(shape)
+    _segment_terms(widths, values, E, hbar2_2m,
+                   (M[0, 0], M[0, 1], M[1, 0], log_scale, np.empty(shape), np.empty(shape)))
+    M[1, 1] = M[0, 0]
+    return M, log_scale
+
+
+def _matmul(A, B):
+    """Batched 2x2 product over the trailing axes of (2, 2, ...) arrays"""
+    return np.einsum('ij...,jk...->ik...', A, B)
+
+
+def _normalize(M, log_scale):
+    """
+    Rescales every matrix to unit max entry. Done after every product: a
+    single scale per energy, applied only when some entry grows too large,
+    lets the small entries of other matrices underflow to 0 on long
+    aperiodic chains.
+    """
+    scale = np.abs(M).max(axis=(0, 1))
+    scale[scale == 0] = 1
+    M /= scale
+    return M, log_scale + np.log(scale)
+
+
+def chain_product(M, log_scale):
+    """
+    Ordered product M[n-1] @ ... @ M[0] over the segment axis of (2, 2, n, ...).
+
+    Neighbouring pairs are multiplied together at each step, so n matrices
+    take log2(n) batched products instead of n - 1 sequential ones.
+    """
+    while M.shape[2] > 1:
+        tail = None
+        if M.shape[2] % 2:
+            tail = M[:, :, -1:], log_scale[-1:]
+            M, log_scale = M[:, :, :-1], log_scale[:-1]
+        M, log_scale = _normalize(_matmul(M[:, :, 1::2], M[:, :, 0::2]),
+                                  log_scale[1::2] + log_scale[0::2])
+        if tail is not None:
+            M = np.concatenate((M, tail[0]), axis=2)
+            log_scale = np.concatenate((log_scale, tail[1]))
+    return M[:, :, 0], log_scale[0]
+
+
+def _identity(shape):
+    M = np.zeros((2, 2) + shape)
+    M[0, 0] = M[1, 1] = 1
+    return M
+
+
+def repeat_product(M, log_scale, n):
+    """M^n by repeated squaring, for n identical cells of a periodic chain"""
+    result, result_log = _identity(log_scale.shape), np.zeros_like(log_scale)
+    while n:
+        if n & 1:
+            result, result_log = _normalize(_matmul(M, result), result_log + log_scale)
+        n >>= 1
+        if n:
+            M, log_scale = _normalize(_matmul(M, M), 2 * log_scale)
+    return result, result_log
+
+
+def _scan(widths, values, E, hbar2_2m, block=None, renormalize=8):
+    """
+    Ordered product of the segment matrices at the energies E, one layer
+    at a time, as (M, log_scale). The running product is two rows of
+    shape (2, n_E), so each layer is four ufunc calls over the chunk. The
+    segment matrices are built block layers at a time into buffers that
+    are reused (about 2**14 entries each, so they stay in cache), or once
+    for every distinct (width, V) pair when there are at most block.
+    """
+    block = block or max(1, 2**14 // len(E))
+    rows = np.zeros((2, 2, len(E)))
+    rows[0, 0] = rows[1, 1] = 1
+    log_scale = np.zeros(len(E))
+    new, tmp = np.empty_like(rows), np.empty_like(rows)
+
+    unique, inverse = np.unique(np.column_stack((widths, values)), axis=0, return_inverse=True)
+    table = len(unique) <= block
+    if table:
+        widths, values, block = unique[:, 0], unique[:, 1], len(unique)
+    buffers = np.empty((6, block, len(E)))
+
+    step = 0
+    for start in range(0, len(widths), block):
+        n = min(block, len(widths) - start)
+        diag, m01, m10, seg_log = _segment_terms(widths[start:start + n], values[start:start + n],
+                                                 E, hbar2_2m, buffers[:, :n])
+        growing = seg_log.any(axis=1)
+        for j in (inverse.ravel() if table else range(n)):
+            # Both diagonal entries are equal: new rows = diag * rows, plus
+            # M01 * row 1 added to row 0 and M10 * row 0 added to row 1
+            np.multiply(diag[j], rows, out=new)
+            np.multiply(m01[j], rows[1], out=tmp[0])
+            np.multiply(m10[j], rows[0], out=tmp[1])
+            new += tmp
+            rows, new = new, rows
+            if growing[j]:
+                log_scale += seg_log[j]
+            step += 1
+            if step % renormalize == 0:
+                scale = np.abs(rows).max(axis=(0, 1))
+                scale[scale == 0] = 1
+                rows /= scale
+                log_scale += np.log(scale)
+    scale = np.abs(rows).max(axis=(0, 1))
+    scale[scale == 0] = 1
+    return rows / scale, log_scale + np.log(scale)
+
+
+def transfer_matrix(edges, values, E, hbar2_2m=1.0, chunk_size=4096, n_threads=None):
+    """
+    Total (psi, psi') transfer matrix across all segments at every energy.
+
+    Returns (M, log_scale) with M of shape (2, 2, n_E). Energies are split
+    into chunks of chunk_size, small enough for the running product to stay
+    in cache, and the chunks run in n_threads threads (os.cpu_count() by
+    default); NumPy releases the GIL in the ufuncs.
+    """
+    E = np.atleast_1d(np.asarray(E, dtype=float))
+    widths = np.diff(np.asarray(edges, dtype=float))
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return _identity(E.shape), np.zeros(E.shape)
+
+    M = np.empty((2, 2) + E.shape)
+    log_scale = np.empty(E.shape)
+
+    def fill(start):
+        stop = start + chunk_size
+        M[:, :, start:stop], log_scale[start:stop] = _scan(widths, values, E[start:stop], hbar2_2m)
+
+    with ThreadPoolExecutor(n_threads or os.cpu_count()) as pool:
+        list(pool.map(fill, range(0, len(E), chunk_size)))
+    return M, log_scale
+
+
+def transmission_from_matrix(M, log_scale, E, V_left, V_right, hbar2_2m=1.0):
+    """
+    Transmission and reflection coefficients for a wave incident from the left.
+
+    M is the transfer matrix between the two semi-infinite leads at
+    potentials V_left and V_right. Energies at or below V_left carry no
+    incident wave and give NaN.
+    """
+    E = np.asarray(E, dtype=float)
+    k_left = np.sqrt((E - V_left) / hbar2_2m + 0j)
+    k_right = np.sqrt((E - V_right) / hbar2_2m + 0j)
+    M11, M12, M21, M22 = M[0, 0], M[0, 1], M[1, 0], M[1, 1]
+
+    D = 1j * k_right * M11 - M21 + 1j * k_left * M22 + k_left * k_right * M12
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        # In logs: |2k/D|^2 may overflow where exp(-2 log_scale) underflows
+        log_T = (np.log(k_right.real / k_left.real) + 2 * np.log(np.abs(2 * k_left))
+                 - 2 * np.log(np.abs(D)) - 2 * log_scale)
+        T = np.exp(log_T)
+        R = np.abs(2 * (1j * k_left * M22 + k_left * k_right * M12) / D - 1)**2
+    incident = E > V_left
+    return np.where(incident, T, np.nan), np.where(incident, R, np.nan)
+
+
+def transmission(edges, values, E, hbar2_2m=1.0):
+    """
+    Transmission and reflection through a piecewise-constant potential.
+
+    The first and last segments are taken as the semi-infinite leads and
+    the segments in between as the scattering region.
+    """
+    values = np.asarray(values, dtype=float)
+    M, log_scale = transfer_matrix(edges[1:-1], values[1:-1], E, hbar2_2m)
+    return transmission_from_matrix(M, log_scale, E, values[0], values[-1], hbar2_2m)
+
+
+def bloch_condition(edges, values, E, hbar2_2m=1.0):
+    """
+    cos(Ka) of the Bloch wave number for a lattice whose unit cell is the
+    given segments, Tr(M)/2. Allowed bands are where it lies in [-1, 1].
+    """
+    M, log_scale = transfer_matrix(edges, values, E, hbar2_2m)
+    with np.errstate(over='ignore', invalid='ignore'):
+        return 0.5 * (M[0, 0] + M[1, 1]) * np.exp(log_scale)
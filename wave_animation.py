@@ -0,0 +1,95 @@
+"""
+Streaming animation of the 2d_wave.py double-slit field.
+
+The field cos(k r - w t) is split once into cos(k r) and sin(k r) parts,
+built from the cached slit geometry of wave_field.DoubleSlitField with
+the 1/sqrt(r + 0.1) amplitudes already applied, so every frame is only
+C cos(w t) + S sin(w t) written into one reused buffer. Frames are
+produced by a generator and streamed to a .npy memmap or to an ffmpeg
+pipe, so peak memory is a few frames whatever the animation length.
+"""
+
+import subprocess
+import numpy as np
+
+from wave_field import DoubleSlitField
+
+
+def double_slit_frames(n_frames, omega=2 * np.pi, dt=0.02, grid_size=400, width=20.0, height=10.0,
+                       wavelength=0.5, slit_dist=1.5, slit_x=4.0, dtype=np.float32):
+    """
+    Yields n_frames fields of shape (grid_size, grid_size) at t = n dt.
+
+    Frame 0 is the field drawn by 2d_wave.py. The same buffer is
+    yielded every time, so copy a frame if it has to outlive the next one.
+    """
+    field = DoubleSlitField(grid_size, width, height)
+    k = 2 * np.pi / wavelength
+    geometry = field.geometry(slit_dist, slit_x)
+    split = geometry.split
+
+    cos_part = np.empty(field.shape, dtype=dtype)
+    sin_part = np.empty(field.shape, dtype=dtype)
+    cos_part[:, :split] = np.cos(k * field.x[:split])
+    sin_part[:, :split] = np.sin(k * field.x[:split])
+    cos_part[:, split:] = np.cos(k * geometry.r1) / geometry.root1 + np.cos(k * geometry.r2) / geometry.root2
+    sin_part[:, split:] = np.sin(k * geometry.r1) / geometry.root1 + np.sin(k * geometry.r2) / geometry.root2
+    del field, geometry
+
+    frame = np.empty_like(cos_part)
+    scratch = np.empty_like(sin_part)
+    for n in range(n_frames):
+        phase = omega * n * dt
+        np.multiply(cos_part, np.cos(phase), out=frame)
+        np.multiply(sin_part, np.sin(phase), out=scratch)
+        frame += scratch
+        yield frame
+
+
+def write_npy(frames, path, n_frames, shape, dtype=np.float32):
+    """
+    Streams frames into a (n_frames, *shape) .npy file through a memmap.
+
+    The file can be read back lazily with np.load(path, mmap_mode='r').
+    """
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n_frames,) + tuple(shape))
+    for i, frame in enumerate(frames):
+        out[i] = frame
+    out.flush()
+    del out
+    return path
+
+
+def write_ffmpeg(frames, path, fps=30, vmin=-1.5, vmax=1.5, cmap='seismic', ffmpeg='ffmpeg'):
+    """
+    Streams frames to an H.264 video through an ffmpeg pipe.
+
+    Colours come from a 256-entry lookup table of the matplotlib colormap
+    and rows are flipped to match imshow(origin='lower'). Frame sides
+    must be even for yuv420p output.
+    """
+    from matplotlib import colormaps
+    lut = (colormaps[cmap](np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+
+    process = None
+    for frame in frames:
+        if process is None:
+            ny, nx = frame.shape
+            levels = np.empty(frame.shape, dtype=frame.dtype)
+            indices = np.empty(frame.shape, dtype=np.uint8)
+            process = subprocess.Popen(
+                [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                 '-s', f'{nx}x{ny}', '-r', str(fps), '-i', '-',
+                 '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', str(path)],
+                stdin=subprocess.PIPE)
+        np.subtract(frame, vmin, out=levels)
+        levels *= 255 / (vmax - vmin)
+        np.clip(levels, 0, 255, out=levels)
+        np.copyto(indices, levels, casting='unsafe')
+        process.stdin.write(lut[indices[::-1]].tobytes())
+
+    if process is not None:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with code {process.returncode}")
+    return path